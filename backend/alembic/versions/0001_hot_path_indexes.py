@@ -0,0 +1,59 @@
+"""Indexes for hot filter paths
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, dialect kwargs)
+INDEXES = [
+    ("ix_restaurants_status_city_area", "restaurants", ["status", "city", "area"], {}),
+    ("ix_restaurants_created_by", "restaurants", ["created_by"], {}),
+    ("ix_menus_restaurant_id", "menus", ["restaurant_id"], {}),
+    ("ix_reviews_restaurant_id_status", "reviews", ["restaurant_id", "status"], {}),
+    ("ix_table_bookings_restaurant_id", "table_bookings", ["restaurant_id"], {}),
+]
+
+
+def _existing(table):
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return None
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Tables are created by the app's create_all, which already includes these
+    # indexes; only databases created before them need the migration.
+    postgres = op.get_bind().dialect.name == "postgresql"
+    for name, table, columns, kwargs in INDEXES:
+        existing = _existing(table)
+        if existing is None or name in existing:
+            continue
+        if postgres:
+            # Build without blocking writers on a live table
+            with op.get_context().autocommit_block():
+                op.create_index(name, table, columns, postgresql_concurrently=True, **kwargs)
+        else:
+            op.create_index(name, table, columns, **kwargs)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _, _ in reversed(INDEXES):
+        existing = _existing(table)
+        if existing and name in existing:
+            op.drop_index(name, table_name=table)
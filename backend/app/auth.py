@@ -1,33 +1,17 @@
-from passlib.context import CryptContext
-from datetime import datetime, timedelta
-from jose import JWTError, jwt
-import os
 from dotenv import load_dotenv
+from common.auth_utils import (
+    create_access_token, decode_token, get_revocation_list, issue_tokens, logout, refresh_tokens,
+)
+from common.passwords import PasswordHasherPool, hash_password, verify_password as _verify_password
 
+# JWT_* settings are read from the environment by common.auth_utils
 load_dotenv()
 
-SECRET_KEY = os.getenv("JWT_SECRET", "secret")
-ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 1 day
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Login/register handlers hash through this pool; the sync helpers below are for seeding
+password_pool = PasswordHasherPool.from_env()
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return _verify_password(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
-
-def create_access_token(data: dict, expires_delta: timedelta = None):
-    to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
-
-def decode_token(token: str):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
-        return None
+    return hash_password(password)
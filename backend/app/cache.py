@@ -0,0 +1,6 @@
+from common.cache import cache_from_env
+
+# Restaurant detail payloads (restaurant, menus, approved reviews), grouped by
+# restaurant id. Writers call restaurant_cache.invalidate(restaurant_id).
+# Namespaced per service, since services may share one CACHE_URL
+restaurant_cache = cache_from_env("backend-restaurant")
@@ -1,11 +1,19 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
+import sys
 from dotenv import load_dotenv
 
+# Make the repo-level ``common`` package importable for entry points that do
+# not go through main.py (python -m app.search, alembic)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from common.db import ReadRouter, database_url, make_engine
+
 load_dotenv()
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+DATABASE_URL = database_url("sqlite:///./app.db")
+engine = make_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Read-only endpoints use replicas from DATABASE_REPLICA_URLS when configured
+read_router = ReadRouter.from_env(SessionLocal)
 Base = declarative_base()
@@ -1,12 +1,19 @@
-from fastapi import Depends, HTTPException, status
+import os
+from typing import NamedTuple, Optional
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
+from common.auth_utils import UserHydrator
 from . import auth
 from .routers.auth import oauth2_scheme
 from sqlalchemy.orm import Session
-from .database import SessionLocal
+from .database import SessionLocal, read_router
 from .models import User
 
+class CurrentUser(NamedTuple):
+    id: int
+    role: Optional[str]
+
 def get_db():
     db = SessionLocal()
     try:
@@ -14,24 +21,49 @@ def get_db():
     finally:
         db.close()
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def get_read_db(request: Request):
+    db = read_router.session(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+def _load_user(user_id: int):
+    db = SessionLocal()
+    try:
+        user = db.query(User.id, User.role).filter(User.id == user_id).first()
+        return CurrentUser(user.id, user.role) if user else None
+    finally:
+        db.close()
+
+# Set AUTH_HYDRATE_USERS=1 to confirm the user still exists (and take the role
+# from the database) on each request, through a short-lived cache.
+hydrate_user = (
+    UserHydrator(_load_user, ttl=float(os.getenv("AUTH_HYDRATE_TTL", "60")))
+    if os.getenv("AUTH_HYDRATE_USERS") == "1" else None
+)
+
+def get_current_user(token: str = Depends(oauth2_scheme)):
+    # Claims-only by default: the signed token already carries id and role
     payload = auth.decode_token(token)
-    if not payload:
+    if not payload or payload.get("user_id") is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = db.query(User).filter(User.id == payload.get("user_id")).first()
+    if hydrate_user is None:
+        return CurrentUser(payload["user_id"], payload.get("role"))
+    user = hydrate_user(payload["user_id"])
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 def require_role(role: str):
-    def role_checker(user: User = Depends(get_current_user)):
+    def role_checker(user: CurrentUser = Depends(get_current_user)):
         if user.role != role:
             raise HTTPException(status_code=403, detail="Insufficient permissions")
         return user
     return role_checker
 
 def require_roles(roles: list):
-    def roles_checker(user: User = Depends(get_current_user)):
+    def roles_checker(user: CurrentUser = Depends(get_current_user)):
         if user.role not in roles:
             raise HTTPException(status_code=403, detail="Insufficient permissions")
         return user
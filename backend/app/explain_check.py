@@ -0,0 +1,47 @@
+"""Check that hot filter paths use an index.
+
+Run from backend/ after migrating::
+
+    alembic upgrade head && python -m app.explain_check
+    python -m app.explain_check --scratch    # schema from models, in-memory SQLite
+"""
+from sqlalchemy import select
+
+# database first: it puts the repo root (and so ``common``) on sys.path
+from . import database, models
+from common.explain import main
+
+HOT_QUERIES = [
+    (
+        "approved restaurants in a city",
+        select(models.Restaurant).where(
+            models.Restaurant.status == "approved",
+            models.Restaurant.city.ilike("%pune%"),
+        ),
+        "ix_restaurants_status_city_area",
+    ),
+    (
+        "restaurant of an admin",
+        select(models.Restaurant).where(models.Restaurant.created_by == 1),
+        "ix_restaurants_created_by",
+    ),
+    (
+        "menus of a restaurant",
+        select(models.Menu).where(models.Menu.restaurant_id == 1),
+        "ix_menus_restaurant_id",
+    ),
+    (
+        "approved reviews of a restaurant",
+        select(models.Review).where(models.Review.restaurant_id == 1, models.Review.status == "approved"),
+        "ix_reviews_restaurant_id_status",
+    ),
+    (
+        "bookings of a restaurant",
+        select(models.TableBooking).where(models.TableBooking.restaurant_id == 1),
+        "ix_table_bookings_restaurant_id",
+    ),
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(database.engine, models.Base.metadata, HOT_QUERIES))
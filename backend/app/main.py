@@ -1,6 +1,14 @@
+import os
+import sys
+
+# Make the repo-level ``common`` package importable when run from backend/
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
 from fastapi import FastAPI
-from .database import Base, engine
+from .database import Base, engine, read_router
+from common.db import StickyPrimaryMiddleware
+from common import metrics, timing
+from common.auth_utils import require_ops_access
 from .routers import auth as auth_router
 from .routers import admin as admin_router
 from .routers import restaurant as restaurant_router
@@ -12,7 +20,8 @@ from .routers import google_auth as google_auth_router
 from fastapi import Depends
 from .dependencies import require_role, get_db
 from sqlalchemy.orm import Session
-from . import seed
+from . import seed, search, auth
+from .cache import restaurant_cache
 
 app = FastAPI(
     title="ZenZomato MVP1 Food Delivery App",
@@ -27,8 +36,26 @@ app = FastAPI(
     ]
 )
 
+# Reads after this client's own write go to the primary (see common.db.ReadRouter)
+app.add_middleware(StickyPrimaryMiddleware, read_router=read_router)
+# /metrics, /debug/timings and /cache/stats need OPS_TOKEN or a superadmin token
+OPS_ONLY = [Depends(require_ops_access)]
+# Outermost, so Server-Timing covers the other middleware too
+timing.install(app, dependencies=OPS_ONLY)
+metrics.install(app, read_router.engines(), dependencies=OPS_ONLY)
+
 # Create tables
 Base.metadata.create_all(bind=engine)
+search.install(engine)
+
+@app.on_event("startup")
+def on_startup():
+    # Load persisted revocations before the first request is verified
+    auth.get_revocation_list()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    auth.password_pool.shutdown()
 
 
 
@@ -50,6 +77,10 @@ app.include_router(admin_restaurants_router.router)
 def ping():
     return {"status": "ok"}
 
+@app.get("/cache/stats", dependencies=OPS_ONLY)
+def cache_stats():
+    return restaurant_cache.stats()
+
 @app.get("/")
 def root():
     return {"message": "Welcome to ZenZomato MVP1!"}
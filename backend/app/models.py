@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from .database import Base
@@ -22,13 +22,29 @@ class Restaurant(Base):
     address = Column(String)
     phone = Column(String)
     status = Column(String)  # "pending", "approved", "rejected"
-    created_by = Column(Integer, ForeignKey("users.id"))
+    created_by = Column(Integer, ForeignKey("users.id"), index=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
+    __table_args__ = (
+        # Listings filter on status; city/area only ride along, since their
+        # ILIKE '%x%' filters cannot seek a B-tree
+        Index("ix_restaurants_status_city_area", "status", "city", "area"),
+    )
+
+# Columns selected for ``view=summary`` listings, matching schemas.RestaurantSummary
+RESTAURANT_SUMMARY_COLUMNS = (
+    Restaurant.id,
+    Restaurant.name,
+    Restaurant.city,
+    Restaurant.area,
+    Restaurant.address,
+    Restaurant.status,
+)
+
 class Menu(Base):
     __tablename__ = "menus"
     id = Column(Integer, primary_key=True, index=True)
-    restaurant_id = Column(Integer, ForeignKey("restaurants.id"))
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), index=True)
     name = Column(String)
     description = Column(String)
     price = Column(Float)
@@ -46,10 +62,14 @@ class Review(Base):
     status = Column(String)  # "pending", "approved", "rejected"
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
+    __table_args__ = (
+        Index("ix_reviews_restaurant_id_status", "restaurant_id", "status"),
+    )
+
 class TableBooking(Base):
     __tablename__ = "table_bookings"
     id = Column(Integer, primary_key=True, index=True)
-    restaurant_id = Column(Integer, ForeignKey("restaurants.id"))
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     booking_date = Column(String)
     booking_time = Column(String)
@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from .. import models, schemas, database
-from ..dependencies import require_role, require_roles, get_db
+from ..cache import restaurant_cache
+from ..dependencies import require_role, require_roles, get_db, get_read_db
+from common.db import commit_returning
+from common.timing import TimedRoute
 
-router = APIRouter(prefix="/admin", tags=["admin"])
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=TimedRoute)
 
 @router.post("/restaurant", response_model=schemas.UserOut)
 def create_restaurant_admin(user: schemas.UserCreate, db: Session = Depends(get_db), superadmin=Depends(require_role("superadmin"))):
@@ -16,10 +19,7 @@ def create_restaurant_admin(user: schemas.UserCreate, db: Session = Depends(get_
         password_hash="",
         role="restaurantadmin"
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return new_user
+    return commit_returning(db, new_user)
 
 @router.post("/restaurant/{id}/approve")
 def approve_restaurant(id: int, db: Session = Depends(get_db), superadmin=Depends(require_role("superadmin"))):
@@ -28,6 +28,7 @@ def approve_restaurant(id: int, db: Session = Depends(get_db), superadmin=Depend
         raise HTTPException(status_code=404, detail="Restaurant not found")
     restaurant.status = "approved"
     db.commit()
+    restaurant_cache.invalidate(id)
     return {"message": "Restaurant approved"}
 
 @router.post("/restaurant/{id}/reject")
@@ -37,6 +38,7 @@ def reject_restaurant(id: int, db: Session = Depends(get_db), superadmin=Depends
         raise HTTPException(status_code=404, detail="Restaurant not found")
     restaurant.status = "rejected"
     db.commit()
+    restaurant_cache.invalidate(id)
     return {"message": "Restaurant rejected"}
 
 @router.post("/comment/{id}/approve")
@@ -45,7 +47,8 @@ def approve_comment(id: int, db: Session = Depends(get_db), superadmin=Depends(r
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
     review.status = "approved"
-    db.commit()
+    commit_returning(db, review)
+    restaurant_cache.invalidate(review.restaurant_id)
     return {"message": "Comment approved"}
 
 @router.post("/comment/{id}/reject")
@@ -54,10 +57,11 @@ def reject_comment(id: int, db: Session = Depends(get_db), superadmin=Depends(re
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
     review.status = "rejected"
-    db.commit()
+    commit_returning(db, review)
+    restaurant_cache.invalidate(review.restaurant_id)
     return {"message": "Comment rejected"}
 
 @router.get("/bookings")
-def view_bookings(db: Session = Depends(get_db), superadmin=Depends(require_role("superadmin"))):
+def view_bookings(db: Session = Depends(get_read_db), superadmin=Depends(require_role("superadmin"))):
     bookings = db.query(models.TableBooking).all()
     return bookings
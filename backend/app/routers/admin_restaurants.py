@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from .. import models, database
+from .. import models, schemas, database, search
 from ..dependencies import require_role, get_db
+from common.timing import TimedRoute
 
-router = APIRouter(prefix="/admin/restaurants", tags=["admin"])
+router = APIRouter(prefix="/admin/restaurants", tags=["admin"], route_class=TimedRoute)
 
 @router.get("/")
 def list_restaurants_admin(
@@ -11,10 +12,14 @@ def list_restaurants_admin(
     area: str = Query(None, description="Filter by area"),
     city: str = Query(None, description="Filter by city"),
     name: str = Query(None, description="Search by restaurant name"),
+    view: str = Query("full", pattern="^(full|summary)$", description="'summary' returns only list columns"),
     db: Session = Depends(get_db),
     superadmin=Depends(require_role("superadmin"))
 ):
-    query = db.query(models.Restaurant)
+    if view == "summary":
+        query = db.query(*models.RESTAURANT_SUMMARY_COLUMNS)
+    else:
+        query = db.query(models.Restaurant)
     if status:
         query = query.filter(models.Restaurant.status == status)
     if area:
@@ -22,5 +27,7 @@ def list_restaurants_admin(
     if city:
         query = query.filter(models.Restaurant.city.ilike(f"%{city}%"))
     if name:
-        query = query.filter(models.Restaurant.name.ilike(f"%{name}%"))
+        query = search.filter_restaurants_by_name(db, query, name)
+    if view == "summary":
+        return [schemas.RestaurantSummary(**row._mapping) for row in query.all()]
     return query.all()
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from .. import models, schemas, auth, database
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError
 from typing import Optional
+from common.db import commit_returning
+from common.timing import TimedRoute
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=TimedRoute)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
@@ -17,30 +20,65 @@ def get_db():
     finally:
         db.close()
 
+# Register/login are async so bcrypt can be awaited on the process pool;
+# the sync session work is pushed to the threadpool instead of the loop.
+def _find_user(db: Session, email: str):
+    return db.query(models.User).filter(models.User.email == email).first()
+
+def _save_user(db: Session, user):
+    return commit_returning(db, user)
+
 @router.post("/register", response_model=schemas.UserOut)
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(_find_user, db, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_pw = auth.get_password_hash(user.password)
+    hashed_pw = await auth.password_pool.hash(user.password)
     new_user = models.User(
         name=user.name,
         email=user.email,
         password_hash=hashed_pw,
         role="user"
     )
-    db.add(new_user)
+    return await run_in_threadpool(_save_user, db, new_user)
+
+def _rehash_user(db: Session, user, new_hash: str):
+    user.password_hash = new_hash
     db.commit()
-    db.refresh(new_user)
-    return new_user
 
 @router.post("/login", response_model=schemas.Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not auth.verify_password(form_data.password, user.password_hash):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_find_user, db, form_data.username)
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await auth.password_pool.verify_and_update(form_data.password, user.password_hash)
+    if not valid:
         raise HTTPException(status_code=401, detail="Incorrect email or password")
-    access_token = auth.create_access_token({"user_id": user.id, "role": user.role})
-    return {"access_token": access_token, "token_type": "bearer"}
+    # Read claims before a rehash commit expires the instance
+    claims = {"user_id": user.id, "role": user.role}
+    if new_hash:
+        # Stored hash predates the current policy; migrate it transparently
+        await run_in_threadpool(_rehash_user, db, user, new_hash)
+    return auth.issue_tokens(claims)
+
+def _claims_for(db: Session, user_id: int):
+    # Re-read on refresh so role changes and deletions apply within one access TTL
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    if not user:
+        return None
+    return {"user_id": user.id, "role": user.role}
+
+@router.post("/refresh", response_model=schemas.Token)
+def refresh(body: schemas.TokenRefresh, db: Session = Depends(get_db)):
+    return auth.refresh_tokens(body.refresh_token, lambda user_id: _claims_for(db, user_id))
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(body: Optional[schemas.TokenRefresh] = None, token: str = Depends(oauth2_scheme)):
+    payload = auth.decode_token(token)
+    if not payload:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    auth.logout(payload, body.refresh_token if body else None)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 @router.get("/me", response_model=schemas.UserOut)
 def get_me(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
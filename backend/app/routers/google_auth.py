@@ -5,8 +5,10 @@ from .. import models, auth, database
 from ..schemas import Token, UserOut
 from ..dependencies import get_db
 import os
+from common.db import commit_returning
+from common.timing import TimedRoute
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=TimedRoute)
 
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 
@@ -32,9 +34,6 @@ def google_login(id_token: str, db: Session = Depends(get_db)):
             social_provider="google",
             role="user"
         )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+        commit_returning(db, user)
     # Return JWT
-    access_token = auth.create_access_token({"user_id": user.id, "role": user.role})
-    return {"access_token": access_token, "token_type": "bearer"}
+    return auth.issue_tokens({"user_id": user.id, "role": user.role})
@@ -1,9 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete, exists, select, update
 from sqlalchemy.orm import Session
 from .. import models, schemas, database
+from ..cache import restaurant_cache
 from ..dependencies import require_role, get_current_user, get_db
+from common.db import commit_returning
+from common.timing import TimedRoute
 
-router = APIRouter(prefix="/restaurant/menu", tags=["menu"])
+router = APIRouter(prefix="/restaurant/menu", tags=["menu"], route_class=TimedRoute)
+
+def _owned_menu(menu_id: int, user):
+    # Ownership rides along in the write's WHERE, so a menu write is one statement
+    return (
+        models.Menu.id == menu_id,
+        models.Menu.restaurant_id.in_(
+            select(models.Restaurant.id).where(models.Restaurant.created_by == user.id)
+        ),
+    )
+
+def _menu_write_refused(db: Session, menu_id: int):
+    # Only reached when the guarded write matched nothing
+    if not db.scalar(select(exists().where(models.Menu.id == menu_id))):
+        raise HTTPException(status_code=404, detail="Menu item not found")
+    raise HTTPException(status_code=403, detail="Not allowed")
 
 @router.post("/", response_model=schemas.UserOut)
 def add_menu_item(
@@ -24,9 +43,8 @@ def add_menu_item(
         price=price,
         image_url=image_url
     )
-    db.add(menu)
-    db.commit()
-    db.refresh(menu)
+    commit_returning(db, menu)
+    restaurant_cache.invalidate(restaurant.id)
     return menu
 
 @router.put("/{menu_id}")
@@ -39,28 +57,27 @@ def edit_menu_item(
     db: Session = Depends(get_db),
     user=Depends(require_role("restaurantadmin"))
 ):
-    menu = db.query(models.Menu).filter(models.Menu.id == menu_id).first()
-    if not menu:
-        raise HTTPException(status_code=404, detail="Menu item not found")
-    restaurant = db.query(models.Restaurant).filter(models.Restaurant.id == menu.restaurant_id).first()
-    if restaurant.created_by != user.id:
-        raise HTTPException(status_code=403, detail="Not allowed")
-    if name: menu.name = name
-    if description: menu.description = description
-    if price: menu.price = price
-    if image_url: menu.image_url = image_url
-    db.commit()
-    db.refresh(menu)
+    changes = {}
+    if name: changes["name"] = name
+    if description: changes["description"] = description
+    if price: changes["price"] = price
+    if image_url: changes["image_url"] = image_url
+    stmt = update(models.Menu).where(*_owned_menu(menu_id, user)).returning(models.Menu)
+    # An empty SET is not valid SQL; a no-op assignment still checks ownership
+    menu = db.scalars(stmt.values(**changes) if changes else stmt.values(id=models.Menu.id)).first()
+    if menu is None:
+        _menu_write_refused(db, menu_id)
+    commit_returning(db, menu)
+    restaurant_cache.invalidate(menu.restaurant_id)
     return menu
 
 @router.delete("/{menu_id}")
 def delete_menu_item(menu_id: int, db: Session = Depends(get_db), user=Depends(require_role("restaurantadmin"))):
-    menu = db.query(models.Menu).filter(models.Menu.id == menu_id).first()
-    if not menu:
-        raise HTTPException(status_code=404, detail="Menu item not found")
-    restaurant = db.query(models.Restaurant).filter(models.Restaurant.id == menu.restaurant_id).first()
-    if restaurant.created_by != user.id:
-        raise HTTPException(status_code=403, detail="Not allowed")
-    db.delete(menu)
+    deleted = db.execute(
+        delete(models.Menu).where(*_owned_menu(menu_id, user)).returning(models.Menu.restaurant_id)
+    ).first()
+    if deleted is None:
+        _menu_write_refused(db, menu_id)
     db.commit()
+    restaurant_cache.invalidate(deleted.restaurant_id)
     return {"message": "Menu item deleted"}
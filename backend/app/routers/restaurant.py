@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from .. import models, schemas, database
+from ..cache import restaurant_cache
 from ..dependencies import require_role, get_current_user, get_db
+from common.db import commit_returning
+from common.timing import TimedRoute
 
-router = APIRouter(prefix="/restaurant", tags=["restaurant-admin"])
+router = APIRouter(prefix="/restaurant", tags=["restaurant-admin"], route_class=TimedRoute)
 
 @router.post("/onboard")
 def request_onboarding(
@@ -24,10 +27,7 @@ def request_onboarding(
         status="pending",
         created_by=user.id
     )
-    db.add(restaurant)
-    db.commit()
-    db.refresh(restaurant)
-    return restaurant
+    return commit_returning(db, restaurant)
 
 @router.put("/update")
 def update_restaurant(
@@ -47,6 +47,6 @@ def update_restaurant(
     if area: restaurant.area = area
     if address: restaurant.address = address
     if phone: restaurant.phone = phone
-    db.commit()
-    db.refresh(restaurant)
+    commit_returning(db, restaurant)
+    restaurant_cache.invalidate(restaurant.id)
     return restaurant
@@ -1,34 +1,49 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
-from .. import models, schemas, database
-from ..dependencies import get_db, get_current_user
+from .. import models, schemas, database, search
+from ..database import read_router
+from ..cache import restaurant_cache
+from ..dependencies import get_db, get_read_db, get_current_user
+from common.db import commit_returning
+from common.timing import TimedRoute
 
-router = APIRouter(tags=["user"])
+router = APIRouter(tags=["user"], route_class=TimedRoute)
 
 @router.get("/restaurants")
 def list_restaurants(
     city: str = Query(None),
     area: str = Query(None),
     dish: str = Query(None),
-    db: Session = Depends(get_db)
+    view: str = Query("full", pattern="^(full|summary)$"),
+    db: Session = Depends(get_read_db)
 ):
-    query = db.query(models.Restaurant).filter(models.Restaurant.status == "approved")
+    if view == "summary":
+        query = db.query(*models.RESTAURANT_SUMMARY_COLUMNS)
+    else:
+        query = db.query(models.Restaurant)
+    query = query.filter(models.Restaurant.status == "approved")
     if city:
         query = query.filter(models.Restaurant.city.ilike(f"%{city}%"))
     if area:
         query = query.filter(models.Restaurant.area.ilike(f"%{area}%"))
     if dish:
-        query = query.join(models.Menu).filter(models.Menu.name.ilike(f"%{dish}%"))
+        query = search.filter_restaurants_by_dish(db, query, dish)
+    if view == "summary":
+        return [schemas.RestaurantSummary(**row._mapping) for row in query.all()]
     return query.all()
 
 @router.get("/restaurant/{id}")
-def restaurant_detail(id: int, db: Session = Depends(get_db)):
-    restaurant = db.query(models.Restaurant).filter(models.Restaurant.id == id, models.Restaurant.status == "approved").first()
-    if not restaurant:
-        raise HTTPException(status_code=404, detail="Restaurant not found")
-    menus = db.query(models.Menu).filter(models.Menu.restaurant_id == id).all()
-    reviews = db.query(models.Review).filter(models.Review.restaurant_id == id, models.Review.status == "approved").all()
-    return {"restaurant": restaurant, "menus": menus, "reviews": reviews}
+def restaurant_detail(id: int, db: Session = Depends(get_read_db)):
+    def load():
+        restaurant = db.query(models.Restaurant).filter(models.Restaurant.id == id, models.Restaurant.status == "approved").first()
+        if not restaurant:
+            raise HTTPException(status_code=404, detail="Restaurant not found")
+        menus = db.query(models.Menu).filter(models.Menu.restaurant_id == id).all()
+        reviews = db.query(models.Review).filter(models.Review.restaurant_id == id, models.Review.status == "approved").all()
+        return jsonable_encoder({"restaurant": restaurant, "menus": menus, "reviews": reviews})
+
+    return restaurant_cache.get_or_load(id, "detail", load, **read_router.cache_options(db))
 
 @router.post("/restaurant/{id}/book")
 def book_table(
@@ -49,10 +64,7 @@ def book_table(
         booking_time=booking_time,
         guests=guests
     )
-    db.add(booking)
-    db.commit()
-    db.refresh(booking)
-    return booking
+    return commit_returning(db, booking)
 
 @router.post("/restaurant/{id}/review")
 def post_review(
@@ -74,7 +86,4 @@ def post_review(
         rating=rating,
         status="pending"
     )
-    db.add(review)
-    db.commit()
-    db.refresh(review)
-    return review
+    return commit_returning(db, review)
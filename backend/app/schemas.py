@@ -25,6 +25,18 @@ class Token(BaseModel):
     refresh_token: Optional[str] = None
     token_type: str = "bearer"
 
+class TokenRefresh(BaseModel):
+    refresh_token: str
+
 class TokenData(BaseModel):
     user_id: Optional[int] = None
     role: Optional[str] = None
+
+# Slim projection for restaurant list screens (``view=summary``)
+class RestaurantSummary(BaseModel):
+    id: int
+    name: Optional[str] = None
+    city: Optional[str] = None
+    area: Optional[str] = None
+    address: Optional[str] = None
+    status: Optional[str] = None
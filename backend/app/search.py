@@ -0,0 +1,216 @@
+"""Full-text search over restaurants and dishes.
+
+On SQLite the ``restaurant_fts`` / ``menu_fts`` FTS5 tables index the
+existing rows (external content) and are kept in sync by triggers, so every
+writer - ORM, bulk or raw SQL - updates the index in the same transaction.
+On Postgres the same queries run against GIN expression indexes over
+``to_tsvector``. Other databases fall back to ``ILIKE``.
+
+Queries match every term as a prefix (``piz marg`` finds "Margherita
+Pizza") and are ranked by relevance. On SQLite a term with no indexed
+prefix is replaced by its closest indexed spelling, which makes search
+tolerant of small typos. Postgres has no typo tolerance yet: ``pg_trgm``
+would provide it, but the extension needs privileges the app's database
+user may not have.
+
+Rebuild the index from the backend directory with::
+
+    python -m app.search rebuild
+"""
+import difflib
+import math
+import re
+
+from sqlalchemy import column, func, text
+from sqlalchemy.orm import Session
+
+from . import models
+
+MAX_TERMS = 8
+# difflib ratio a misspelled term must reach against its replacement
+SPELLING_CUTOFF = 0.75
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+_INDEXES = {
+    # index name: (content table, indexed columns)
+    "restaurant_fts": ("restaurants", ("name",)),
+    "menu_fts": ("menus", ("name", "description")),
+}
+
+
+def is_search_table(name: str) -> bool:
+    """True for the FTS tables and the vocab/shadow tables SQLite derives from them."""
+    return name.startswith(tuple(_INDEXES))
+
+
+# ---------- Schema ----------
+def _sqlite_ddl(index, table, columns):
+    cols = ", ".join(columns)
+    new_vals = ", ".join(f"new.{c}" for c in columns)
+    old_vals = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+        f"{cols}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {index}_vocab USING fts5vocab({index}, 'row')",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {index}(rowid, {cols}) VALUES (new.id, {new_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {index}({index}, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {index}({index}, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); "
+        f"INSERT INTO {index}(rowid, {cols}) VALUES (new.id, {new_vals}); END",
+    ]
+
+
+def _pg_document(columns):
+    return " || ' ' || ".join(f"coalesce({c}, '')" for c in columns)
+
+
+def install(engine):
+    """Create search indexes (idempotent); a fresh SQLite index is filled from existing rows."""
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            for index, (table, columns) in _INDEXES.items():
+                exists = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                    {"name": index},
+                ).first()
+                for stmt in _sqlite_ddl(index, table, columns):
+                    conn.execute(text(stmt))
+                if not exists:
+                    conn.execute(text(f"INSERT INTO {index}({index}) VALUES ('rebuild')"))
+        elif engine.dialect.name == "postgresql":
+            for index, (table, columns) in _INDEXES.items():
+                conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS {index}_idx ON {table} "
+                    f"USING gin (to_tsvector('simple', {_pg_document(columns)}))"
+                ))
+
+
+def rebuild(engine):
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            for index in _INDEXES:
+                conn.execute(text(f"INSERT INTO {index}({index}) VALUES ('rebuild')"))
+                conn.execute(text(f"INSERT INTO {index}({index}) VALUES ('optimize')"))
+        elif engine.dialect.name == "postgresql":
+            for index in _INDEXES:
+                conn.execute(text(f"REINDEX INDEX {index}_idx"))
+
+
+# ---------- Queries ----------
+def _terms(query: str):
+    return [t.lower() for t in _TERM.findall(query)][:MAX_TERMS]
+
+
+def _next_prefix(term: str) -> str:
+    """Smallest string greater than every string starting with ``term``."""
+    return term[:-1] + chr(ord(term[-1]) + 1)
+
+
+def _correct_terms(db: Session, index: str, terms):
+    """Keep each term that prefixes an indexed term, else use its closest indexed spelling.
+
+    The prefix check is one statement of range lookups (``term >= :t AND
+    term < :t_upper``), which fts5vocab answers without a scan. Only terms
+    that miss load candidates: typos rarely touch the first letter, and
+    difflib's cutoff bounds the length of any close match.
+    """
+    vocab = f"{index}_vocab"
+    params = {}
+    probes = []
+    for i, term in enumerate(terms):
+        params[f"t{i}"], params[f"u{i}"] = term, _next_prefix(term)
+        probes.append(f"(SELECT 1 FROM {vocab} WHERE term >= :t{i} AND term < :u{i} LIMIT 1)")
+    found = db.execute(text("SELECT " + ", ".join(probes)), params).one()
+    misses = [i for i, hit in enumerate(found) if not hit]
+    if not misses:
+        return list(terms)
+
+    # One read for every missing term's candidates. ratio = 2 * matches /
+    # (len(term) + len(candidate)) and matches <= the shorter length, which
+    # bounds the candidate's length; rounded outwards, so float error can
+    # only admit an extra candidate.
+    c = SPELLING_CUTOFF
+    params = {}
+    selects = []
+    for i in misses:
+        term = terms[i]
+        params.update({
+            f"f{i}": term[0], f"a{i}": _next_prefix(term[0]),
+            f"s{i}": math.floor(len(term) * c / (2 - c)), f"l{i}": math.ceil(len(term) * (2 - c) / c),
+        })
+        selects.append(
+            f"SELECT {i} AS i, term FROM {vocab} WHERE term >= :f{i} AND term < :a{i} "
+            f"AND length(term) BETWEEN :s{i} AND :l{i}"
+        )
+    candidates = {i: [] for i in misses}
+    for i, term in db.execute(text(" UNION ALL ".join(selects)), params):
+        candidates[i].append(term)
+
+    corrected = list(terms)
+    for i in misses:
+        matches = difflib.get_close_matches(terms[i], candidates[i], n=1, cutoff=SPELLING_CUTOFF)
+        if matches:
+            corrected[i] = matches[0]
+    return corrected
+
+
+def _hits(db: Session, index: str, query: str):
+    """Subquery of (id, score) rows matching ``query``; lower score ranks first."""
+    terms = _terms(query)
+    if not terms:
+        return None
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        terms = _correct_terms(db, index, terms)
+        match = " ".join(f'"{t}"*' for t in terms)
+        sql = text(f"SELECT rowid AS id, rank AS score FROM {index} WHERE {index} MATCH :match")
+        return sql.bindparams(match=match).columns(column("id"), column("score")).subquery(index + "_hits")
+    if dialect == "postgresql":
+        table, columns = _INDEXES[index]
+        tsquery = " & ".join(f"{t}:*" for t in terms)
+        document = f"to_tsvector('simple', {_pg_document(columns)})"
+        sql = text(
+            f"SELECT id, -ts_rank({document}, to_tsquery('simple', :tsquery)) AS score "
+            f"FROM {table} WHERE {document} @@ to_tsquery('simple', :tsquery)"
+        )
+        return sql.bindparams(tsquery=tsquery).columns(column("id"), column("score")).subquery(index + "_hits")
+    return None
+
+
+def filter_restaurants_by_name(db: Session, query, name: str):
+    """Restrict a Restaurant query to name matches, best first."""
+    hits = _hits(db, "restaurant_fts", name)
+    if hits is None:
+        return query.filter(models.Restaurant.name.ilike(f"%{name}%"))
+    return query.join(hits, hits.c.id == models.Restaurant.id).order_by(hits.c.score)
+
+
+def filter_restaurants_by_dish(db: Session, query, dish: str):
+    """Restrict a Restaurant query to restaurants serving a matching dish, best dish first."""
+    hits = _hits(db, "menu_fts", dish)
+    if hits is None:
+        return query.join(models.Menu).filter(models.Menu.name.ilike(f"%{dish}%"))
+    best = (
+        db.query(
+            models.Menu.restaurant_id.label("restaurant_id"),
+            func.min(hits.c.score).label("score"),
+        )
+        .join(hits, hits.c.id == models.Menu.id)
+        .group_by(models.Menu.restaurant_id)
+        .subquery("dish_hits")
+    )
+    return query.join(best, best.c.restaurant_id == models.Restaurant.id).order_by(best.c.score)
+
+
+if __name__ == "__main__":
+    import sys
+    from .database import engine
+
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python -m app.search rebuild")
+    install(engine)
+    rebuild(engine)
+    print("Search index rebuilt.")
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    # Settings are read at import time, and importing main creates the tables
+    workdir = tmp_path_factory.mktemp("backend")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DATABASE_URL", f"sqlite:///{workdir / 'app.db'}")
+        mp.setenv("JWT_REVOCATION_FILE", str(workdir / "revoked_tokens.jsonl"))
+        mp.delenv("CACHE_URL", raising=False)
+        mp.delenv("DATABASE_REPLICA_URLS", raising=False)
+        mp.chdir(workdir)
+        # Makes the ``app`` package importable, as when running from backend/
+        mp.syspath_prepend(BACKEND_DIR)
+        from app import main
+        yield main.app
+
+
+@pytest.fixture(scope="session")
+def sessions(app):
+    """The session dependencies whose statements count against a request."""
+    from app import dependencies
+
+    return dependencies.get_db, dependencies.get_read_db
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def restaurants(client):
+    """Ids of approved restaurants, each with menus and approved reviews."""
+    from app import database, models
+
+    db = database.SessionLocal()
+    try:
+        ids = []
+        for n in range(3):
+            restaurant = models.Restaurant(name=f"Restaurant {n}", city="Pune", area="Baner", status="approved")
+            db.add(restaurant)
+            db.flush()
+            db.add_all(models.Menu(restaurant_id=restaurant.id, name=f"Dish {n}.{i}", price=9.5) for i in range(3))
+            db.add_all(
+                models.Review(restaurant_id=restaurant.id, comment="ok", rating=4.0, status="approved")
+                for _ in range(2)
+            )
+            ids.append(restaurant.id)
+        db.commit()
+        return ids
+    finally:
+        db.close()
@@ -0,0 +1,12 @@
+from sqlalchemy import create_engine
+
+from common.explain import check
+
+
+def test_hot_queries_use_their_index(app):
+    from app import explain_check
+
+    engine = create_engine("sqlite://")
+    explain_check.models.Base.metadata.create_all(engine)
+    failures = check(engine, explain_check.HOT_QUERIES)
+    assert not failures, "\n\n".join(f"{d}: expected {index}\n{plan}" for d, index, plan in failures)
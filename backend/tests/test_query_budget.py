@@ -0,0 +1,12 @@
+import pytest
+
+
+# Restaurant, menus and approved reviews, one query each on a cache miss
+@pytest.mark.query_budget(max_queries=3, max_repeats=1)
+def test_restaurant_detail(client, sessions, restaurants, query_budget):
+    with query_budget(client.app, *sessions):
+        response = client.get(f"/restaurant/{restaurants[0]}")
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["menus"]) == 3
+    assert len(body["reviews"]) == 2
@@ -0,0 +1,24 @@
+"""Benchmark and load-test suite for the backend and restaurant_service apps.
+
+Run from the repository root::
+
+    python -m bench run                                   # every target, 1k scale, in-process
+    python -m bench run --target restaurant --scale 100k --transport uvicorn
+    python -m bench run --save-baseline                   # record bench/baselines/*.json
+    python -m bench run --threshold 0.2                   # exit 1 on a >20% regression
+    python -m bench seed --target backend --scale 1m      # pre-build a seeded database
+    python -m bench run --target restaurant --target restaurant-async   # async vs sync capacity
+    python -m bench querycheck                            # exit 1 if a hot spot exceeds its SQL budget
+
+Each target runs in its own process (the apps share flat module names such
+as ``models``) against a copy of a seeded SQLite database, so writes made
+by one run never leak into the next. ``asgi`` drives the app in-process
+through httpx; ``uvicorn`` starts a local server and goes over HTTP.
+
+``querycheck`` sends each scenario that declares a ``QueryBudget`` once
+and fails on extra statements or repeated statement shapes (N+1 queries);
+see ``common.querycount``.
+
+Needs ``httpx`` and, for ``--transport uvicorn``, ``uvicorn``. Baselines
+are only comparable on the machine that recorded them.
+"""
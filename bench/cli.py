@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from bench.worker import TARGETS
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(REPO_ROOT, "bench")
+DATA_DIR = os.path.join(BENCH_DIR, ".data")
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+SCALE_CHOICES = ("1k", "100k", "1m")
+
+
+def _worker(target: str, scale: str, extra: list) -> dict:
+    """Run bench.worker for ``target`` in a scratch directory and return its results."""
+    with tempfile.TemporaryDirectory(prefix=f"bench-{target}-") as run_dir:
+        out = os.path.join(run_dir, "results.json")
+        env = dict(
+            os.environ,
+            PYTHONPATH=os.pathsep.join([REPO_ROOT, os.path.join(REPO_ROOT, TARGETS[target]["dir"])]),
+            DATABASE_URL=f"sqlite:///{os.path.join(run_dir, 'bench.db')}",
+            JWT_SECRET=os.getenv("BENCH_JWT_SECRET", "bench-secret"),
+            JWT_REVOCATION_FILE=os.path.join(run_dir, "revoked_tokens.jsonl"),
+        )
+        # Replica, key-file, cache or driver settings from the shell would make runs incomparable
+        for name in ("DATABASE_REPLICA_URLS", "JWT_KEYS", "JWT_KEYS_FILE", "CACHE_URL", "ASYNC_DB"):
+            env.pop(name, None)
+        env.update(TARGETS[target].get("env", {}))
+        cmd = [sys.executable, "-m", "bench.worker", "--target", target, "--scale", scale,
+               "--data-dir", DATA_DIR, "--out", out] + extra
+        subprocess.run(cmd, cwd=run_dir, env=env, check=True)
+        if not os.path.exists(out):
+            return {}
+        with open(out) as f:
+            return json.load(f)
+
+
+def baseline_path(target: str, scale: str, transport: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{target}-{scale}-{transport}.json")
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Regressions beyond ``threshold`` (a fraction) in p95 latency or throughput."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms")
+        if base["throughput"] and current["throughput"] < base["throughput"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {base['throughput']}/s -> {current['throughput']}/s")
+        if current["errors"] > base.get("errors", 0) and current["errors"] > current["requests"] * threshold:
+            regressions.append(f"{name}: {current['errors']} errors of {current['requests']} requests")
+    return regressions
+
+
+def _print_table(target: str, scale: str, transport: str, results: dict):
+    print(f"\n{target} @ {scale} ({transport})")
+    print(f"{'endpoint':<26}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, r in results.items():
+        print(f"{name:<26}{r['throughput']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['errors']:>8}")
+
+
+def _print_async_comparison(sync: dict, async_: dict):
+    print("\nrestaurant: ASYNC_DB=1 vs sync")
+    print(f"{'endpoint':<26}{'sync req/s':>12}{'async req/s':>12}{'ratio':>8}{'sync p95':>10}{'async p95':>10}")
+    for name in [n for n in sync if n in async_]:
+        s, a = sync[name], async_[name]
+        ratio = f"{a['throughput'] / s['throughput']:.2f}x" if s["throughput"] else "-"
+        print(f"{name:<26}{s['throughput']:>12}{a['throughput']:>12}{ratio:>8}{s['p95_ms']:>10}{a['p95_ms']:>10}")
+
+
+def run(args) -> int:
+    extra = ["--transport", args.transport, "--workers", str(args.workers), "--duration", str(args.duration),
+             "--warmup", str(args.warmup), "--concurrency", str(args.concurrency)]
+    for endpoint in args.endpoint or ():
+        extra += ["--endpoint", endpoint]
+
+    report, failed = {}, False
+    for target in args.target or sorted(TARGETS):
+        results = _worker(target, args.scale, extra)
+        report[target] = results
+        _print_table(target, args.scale, args.transport, results)
+
+        path = baseline_path(target, args.scale, args.transport)
+        if args.save_baseline:
+            os.makedirs(BASELINE_DIR, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+            print(f"baseline saved to {os.path.relpath(path, REPO_ROOT)}")
+        elif os.path.exists(path):
+            with open(path) as f:
+                regressions = compare(results, json.load(f), args.threshold)
+            for line in regressions:
+                print(f"REGRESSION {target} {line}")
+            failed = failed or bool(regressions)
+        else:
+            print(f"no baseline at {os.path.relpath(path, REPO_ROOT)}; run with --save-baseline to record one")
+
+    if "restaurant" in report and "restaurant-async" in report:
+        _print_async_comparison(report["restaurant"], report["restaurant-async"])
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    return 1 if failed else 0
+
+
+def querycheck(args) -> int:
+    extra = []
+    for endpoint in args.endpoint or ():
+        extra += ["--endpoint", endpoint]
+
+    failed = False
+    for target in args.target or sorted(TARGETS):
+        results = _worker(target, args.scale, ["--query-check"] + extra)
+        print(f"\n{target} @ {args.scale}")
+        for name, result in results.items():
+            budget = ", ".join(f"{key}={value}" for key, value in result["budget"].items() if value is not None)
+            verdict = "FAIL" if result["violations"] else "ok"
+            print(f"{name:<26}{verdict:<6}statements {result['statements']} (budget {budget}), HTTP {result['status']}")
+            for line in result["violations"]:
+                print(f"    {line}")
+            failed = failed or bool(result["violations"])
+    return 1 if failed else 0
+
+
+def seed(args) -> int:
+    for target in args.target or sorted(TARGETS):
+        _worker(target, args.scale, ["--seed-only"])
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Benchmark the backend and restaurant_service")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--target", action="append", choices=sorted(TARGETS), help="default: every target")
+    common.add_argument("--scale", choices=SCALE_CHOICES, default="1k", help="menu rows to seed")
+
+    run_parser = sub.add_parser("run", parents=[common], help="seed (if needed) and load-test")
+    run_parser.add_argument("--transport", choices=("asgi", "uvicorn"), default="asgi")
+    run_parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    run_parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per endpoint")
+    run_parser.add_argument("--warmup", type=float, default=1.0, help="unrecorded seconds per endpoint")
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--endpoint", action="append", help="limit to these scenarios")
+    run_parser.add_argument("--threshold", type=float, default=0.2, help="allowed regression as a fraction")
+    run_parser.add_argument("--save-baseline", action="store_true")
+    run_parser.add_argument("--json", help="also write the full report here")
+    run_parser.set_defaults(func=run)
+
+    check_parser = sub.add_parser("querycheck", parents=[common], help="fail on endpoints over their SQL budget")
+    check_parser.add_argument("--endpoint", action="append", help="limit to these scenarios")
+    check_parser.set_defaults(func=querycheck)
+
+    seed_parser = sub.add_parser("seed", parents=[common], help="build the cached seeded databases")
+    seed_parser.set_defaults(func=seed)
+
+    args = parser.parse_args()
+    return args.func(args)
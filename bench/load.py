@@ -0,0 +1,58 @@
+import asyncio
+import math
+import random
+import time
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "throughput": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else 0.0,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+    }
+
+
+async def drive(client, scenario, concurrency: int, duration: float, warmup: float = 1.0, seed: int = 0) -> dict:
+    """Run ``scenario`` from ``concurrency`` closed-loop workers for ``duration`` seconds.
+
+    Requests finishing during the warmup window are not recorded, so
+    connection setup and cold caches do not skew the percentiles.
+    """
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    record_from = started + warmup
+    deadline = record_from + duration
+
+    async def worker(n):
+        nonlocal errors
+        rng = random.Random(seed * 1000 + n)
+        while True:
+            sent = time.perf_counter()
+            if sent >= deadline:
+                return
+            response = await scenario.request(client, rng)
+            done = time.perf_counter()
+            if sent < record_from:
+                continue
+            if response.status_code in scenario.ok:
+                latencies.append(done - sent)
+            else:
+                errors += 1
+
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - record_from)
@@ -0,0 +1,113 @@
+from datetime import timedelta
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from common.auth_utils import create_access_token
+from common.querycount import QueryBudget
+
+from bench import seeding
+
+# Smallest valid PNG (1x1, transparent), so uploads measure the request path
+# rather than image size
+PNG_1X1 = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000b49444154789c6360000200000500017a5eab3f0000000049454e44ae426082"
+)
+
+
+class Scenario(NamedTuple):
+    name: str
+    request: Callable  # (client, rng) -> awaitable response
+    ok: Tuple[int, ...] = (200,)
+    # Checked by ``python -m bench querycheck``
+    budget: Optional[QueryBudget] = None
+
+
+def _bearer(user_id: int, role: str) -> dict:
+    token = create_access_token({"user_id": user_id, "role": role}, expires_delta=timedelta(hours=6))
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _approved_id(rng, restaurants: int) -> int:
+    # Seeded restaurants with id % 10 == 0 are pending
+    while True:
+        restaurant_id = rng.randint(1, restaurants)
+        if restaurant_id % 10:
+            return restaurant_id
+
+
+def restaurant_service(menu_rows: int):
+    restaurants = seeding.restaurant_count(menu_rows)
+    # Seeded restaurant 1 belongs to owner 2 (owner_id = 1 + id % OWNERS)
+    owner = _bearer(2, "restaurantadmin")
+
+    def upload(client, rng):
+        return client.post(
+            "/restaurant/1/menu",
+            data={"name": seeding.dish_name(rng), "price": "9.99", "description": "bench"},
+            files={"image": ("dish.png", PNG_1X1, "image/png")},
+            headers=owner,
+        )
+
+    def menu_update(client, rng):
+        # Menu rows are dealt round-robin, so ids 1, 1 + restaurants, ... belong to restaurant 1
+        item_id = 1 + restaurants * rng.randrange(seeding.MENU_ITEMS_PER_RESTAURANT)
+        return client.put(
+            f"/restaurant/1/menu/{item_id}",
+            json={"name": seeding.dish_name(rng), "price": 9.99, "description": "bench"},
+            headers=owner,
+        )
+
+    return [
+        Scenario("restaurant_list", lambda client, rng: client.get(
+            "/restaurant/", params={"after": rng.randint(0, max(0, restaurants - 20)), "limit": 20}),
+            # One page query plus one selectinload each for menu_items and timings
+            budget=QueryBudget(max_queries=3, max_repeats=1)),
+        Scenario("restaurant_list_summary", lambda client, rng: client.get(
+            "/restaurant/", params={"after": rng.randint(0, max(0, restaurants - 20)), "view": "summary"}),
+            # Summary columns only, no relationships
+            budget=QueryBudget(max_queries=1)),
+        Scenario("menu_list", lambda client, rng: client.get(f"/restaurant/{rng.randint(1, restaurants)}/menu"),
+                 budget=QueryBudget(max_queries=1)),
+        Scenario("detail", lambda client, rng: client.get(f"/restaurant/{rng.randint(1, restaurants)}"),
+                 budget=QueryBudget(max_queries=3, max_repeats=1)),
+        # Ownership check, then the INSERT
+        Scenario("upload", upload, ok=(201,), budget=QueryBudget(max_queries=2, max_repeats=1)),
+        # One guarded UPDATE ... RETURNING
+        Scenario("menu_update", menu_update, budget=QueryBudget(max_queries=1)),
+    ]
+
+
+def backend(menu_rows: int):
+    restaurants = seeding.restaurant_count(menu_rows)
+    user = _bearer(1, "user")
+
+    def login(client, rng):
+        return client.post("/auth/login", data={"username": seeding.LOGIN_EMAIL, "password": seeding.LOGIN_PASSWORD})
+
+    def booking(client, rng):
+        return client.post(
+            f"/restaurant/{_approved_id(rng, restaurants)}/book",
+            params={"booking_date": "2030-01-01", "booking_time": "19:30", "guests": rng.randint(1, 6)},
+            headers=user,
+        )
+
+    return [
+        # One user lookup; seeded hashes use the current policy, so no rehash
+        Scenario("login", login, budget=QueryBudget(max_queries=1)),
+        Scenario("restaurant_list", lambda client, rng: client.get(
+            "/restaurants", params={"city": rng.choice(seeding.CITIES), "view": "summary"}),
+            budget=QueryBudget(max_queries=1)),
+        Scenario("detail", lambda client, rng: client.get(f"/restaurant/{_approved_id(rng, restaurants)}"),
+                 # Restaurant, menus and reviews are three separate queries on a cache miss
+                 budget=QueryBudget(max_queries=3, max_repeats=1)),
+        Scenario("search", lambda client, rng: client.get(
+            "/restaurants", params={"dish": rng.choice(seeding.DISHES), "view": "summary"}),
+            # One vocabulary prefix check, then the ranked query; a misspelled term adds a candidate read
+            budget=QueryBudget(max_queries=2, max_repeats=1)),
+        # Restaurant check, then the INSERT
+        Scenario("booking", booking, budget=QueryBudget(max_queries=2, max_repeats=1)),
+    ]
+
+
+# restaurant-async runs the same scenarios with ASYNC_DB=1, so the two compare directly
+SCENARIOS = {"restaurant": restaurant_service, "restaurant-async": restaurant_service, "backend": backend}
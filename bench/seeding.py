@@ -0,0 +1,137 @@
+"""Deterministic synthetic data at a given number of menu rows.
+
+Imported inside a worker process whose ``sys.path`` has the target app on it.
+"""
+import random
+
+from sqlalchemy import insert
+
+from common.db import make_engine
+from common.passwords import hash_password
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+MENU_ITEMS_PER_RESTAURANT = 50
+OWNERS = 100
+BATCH_SIZE = 10_000
+
+CITIES = ["Pune", "Mumbai", "Delhi", "Bengaluru", "Chennai", "Kolkata", "Hyderabad", "Jaipur", "Goa", "Indore"]
+AREAS = ["Downtown", "Uptown", "Old Town", "Harbour", "Station", "Market", "Hills", "Riverside"]
+ADJECTIVES = ["Spicy", "Classic", "Smoky", "Crispy", "Creamy", "Tandoori", "Garlic", "Cheesy", "Masala", "Grilled"]
+DISHES = ["Pizza", "Burger", "Biryani", "Paneer", "Noodles", "Dosa", "Tacos", "Pasta", "Momos", "Curry", "Salad", "Wrap"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Credentials of the seeded account used by the login scenario
+LOGIN_EMAIL = "bench-user@example.com"
+LOGIN_PASSWORD = "bench-password"
+
+
+def restaurant_count(menu_rows: int) -> int:
+    return max(10, menu_rows // MENU_ITEMS_PER_RESTAURANT)
+
+
+def dish_name(rng):
+    return f"{rng.choice(ADJECTIVES)} {rng.choice(DISHES)}"
+
+
+def _insert_batched(conn, table, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.execute(insert(table), batch)
+            batch = []
+    if batch:
+        conn.execute(insert(table), batch)
+
+
+def seed_restaurant_service(path: str, menu_rows: int, seed: int = 42):
+    import models
+
+    rng = random.Random(seed)
+    restaurants = restaurant_count(menu_rows)
+    engine = make_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        _insert_batched(conn, models.Restaurant, (
+            {
+                "id": i,
+                "name": f"Restaurant {i}",
+                "address": f"{i} {rng.choice(AREAS)} Road, {rng.choice(CITIES)}",
+                "owner_id": 1 + i % OWNERS,
+                "license_number": f"LIC-{i:07d}",
+                # Roughly one in ten is still waiting for approval
+                "approved": "pending" if i % 10 == 0 else "approved",
+            }
+            for i in range(1, restaurants + 1)
+        ))
+        _insert_batched(conn, models.MenuItem, (
+            {
+                "name": dish_name(rng),
+                "description": "Chef's special",
+                "price": round(rng.uniform(2, 40), 2),
+                "restaurant_id": 1 + n % restaurants,
+            }
+            for n in range(menu_rows)
+        ))
+        _insert_batched(conn, models.RestaurantTiming, (
+            {"restaurant_id": i, "day_of_week": day, "open_time": "09:00", "close_time": "22:00"}
+            for i in range(1, restaurants + 1)
+            for day in DAYS
+        ))
+    engine.dispose()
+
+
+def seed_backend(path: str, menu_rows: int, seed: int = 42):
+    from app import models, search
+
+    rng = random.Random(seed)
+    restaurants = restaurant_count(menu_rows)
+    engine = make_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(engine)
+    password_hash = hash_password(LOGIN_PASSWORD)
+    with engine.begin() as conn:
+        # id 1 is the login/booking user; 2..OWNERS+1 are restaurant admins
+        users = [{"id": 1, "name": "Bench User", "email": LOGIN_EMAIL, "password_hash": password_hash, "role": "user"}]
+        users += [
+            {"id": i, "name": f"Owner {i}", "email": f"owner{i}@example.com", "password_hash": "", "role": "restaurantadmin"}
+            for i in range(2, OWNERS + 2)
+        ]
+        conn.execute(insert(models.User), users)
+        _insert_batched(conn, models.Restaurant, (
+            {
+                "id": i,
+                "name": f"Restaurant {i}",
+                "city": rng.choice(CITIES),
+                "area": rng.choice(AREAS),
+                "address": f"{i} Main Road",
+                "phone": f"{9000000000 + i}",
+                "status": "pending" if i % 10 == 0 else "approved",
+                "created_by": 2 + i % OWNERS,
+            }
+            for i in range(1, restaurants + 1)
+        ))
+        _insert_batched(conn, models.Menu, (
+            {
+                "restaurant_id": 1 + n % restaurants,
+                "name": dish_name(rng),
+                "description": "Chef's special",
+                "price": round(rng.uniform(2, 40), 2),
+            }
+            for n in range(menu_rows)
+        ))
+        _insert_batched(conn, models.Review, (
+            {
+                "restaurant_id": 1 + n % restaurants,
+                "user_id": 1,
+                "comment": "Great food",
+                "rating": rng.randint(1, 5),
+                "status": "approved" if n % 4 else "pending",
+            }
+            for n in range(menu_rows // 5)
+        ))
+    # Installing after the bulk insert fills the FTS tables in one pass
+    search.install(engine)
+    engine.dispose()
+
+
+SEEDERS = {"restaurant": seed_restaurant_service, "backend": seed_backend}
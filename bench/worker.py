@@ -0,0 +1,185 @@
+"""Seeds and drives one target from inside its own process.
+
+Started by ``bench.cli`` with the target app on PYTHONPATH, a scratch
+working directory and DATABASE_URL pointing at a copy of the seeded
+database; not meant to be run by hand.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import time
+
+TARGETS = {
+    "restaurant": {
+        "dir": os.path.join("services", "restaurant_service"),
+        "app": "main:app",
+        "sessions": ["database:get_db", "database:get_read_db"],
+    },
+    # The same service and seed with ASYNC_DB=1, to compare async and sync capacity
+    "restaurant-async": {
+        "dir": os.path.join("services", "restaurant_service"),
+        "app": "main:app",
+        "sessions": ["database:get_db", "database:get_read_db", "database:get_async_db", "database:get_async_read_db"],
+        "seed": "restaurant",
+        "env": {"ASYNC_DB": "1"},
+    },
+    "backend": {
+        "dir": "backend",
+        "app": "app.main:app",
+        "sessions": ["app.dependencies:get_db", "app.dependencies:get_read_db", "app.routers.auth:get_db"],
+    },
+}
+
+# Bump when the seeded data changes so cached databases are rebuilt
+SEED_VERSION = 1
+
+
+def seeded_database(target: str, scale: str, data_dir: str) -> str:
+    """Path of the cached seeded database, building it on first use."""
+    from bench import seeding
+
+    target = TARGETS[target].get("seed", target)
+    path = os.path.join(data_dir, f"{target}-{scale}-v{SEED_VERSION}.db")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        partial = path + ".partial"
+        if os.path.exists(partial):
+            os.remove(partial)
+        started = time.perf_counter()
+        seeding.SEEDERS[target](partial, seeding.SCALES[scale])
+        os.replace(partial, path)
+        print(f"seeded {target} at {scale} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return path
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_up(client, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get("/ping")).status_code == 200:
+                return
+        except Exception:
+            if time.monotonic() > deadline:
+                raise
+        await asyncio.sleep(0.2)
+
+
+async def _run_scenarios(client, scenarios, args) -> dict:
+    from bench.load import drive
+
+    results = {}
+    for seed, scenario in enumerate(scenarios):
+        if args.endpoint and scenario.name not in args.endpoint:
+            continue
+        results[scenario.name] = await drive(
+            client, scenario, args.concurrency, args.duration, warmup=args.warmup, seed=seed
+        )
+        print(f"  {scenario.name}: {results[scenario.name]}", file=sys.stderr)
+    return results
+
+
+def _load(spec: str):
+    """The object named by ``module:attr``."""
+    module, _, attr = spec.partition(":")
+    return getattr(__import__(module, fromlist=[attr]), attr)
+
+
+async def query_check(args) -> dict:
+    """Run each scenario that declares a query budget once, in process."""
+    import httpx
+    from bench.scenarios import SCENARIOS
+    from bench.seeding import SCALES
+    from common.querycount import QueryBudgetExceeded, guard
+
+    target = TARGETS[args.target]
+    app = _load(target["app"])
+    sessions = [_load(spec) for spec in target["sessions"]]
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for seed, scenario in enumerate(SCENARIOS[args.target](SCALES[args.scale])):
+                if scenario.budget is None or (args.endpoint and scenario.name not in args.endpoint):
+                    continue
+                result = {"budget": scenario.budget._asdict(), "violations": []}
+                try:
+                    with guard(app, scenario.budget, *sessions) as requests:
+                        response = await scenario.request(client, random.Random(seed))
+                except QueryBudgetExceeded as exc:
+                    result["violations"] = str(exc).splitlines()[1:]
+                result["status"] = response.status_code
+                result["statements"] = [len(statements) for statements in requests]
+                results[scenario.name] = result
+    return results
+
+
+async def run(args) -> dict:
+    import httpx
+    from bench.scenarios import SCENARIOS
+    from bench.seeding import SCALES
+
+    scenarios = SCENARIOS[args.target](SCALES[args.scale])
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    if args.transport == "asgi":
+        app = _load(TARGETS[args.target]["app"])
+        transport = httpx.ASGITransport(app=app)
+        # Run startup/shutdown handlers, which ASGITransport alone does not
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits) as client:
+                return await _run_scenarios(client, scenarios, args)
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", TARGETS[args.target]["app"],
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", "--workers", str(args.workers)],
+    )
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            await _wait_until_up(client)
+            return await _run_scenarios(client, scenarios, args)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target", required=True, choices=sorted(TARGETS))
+    parser.add_argument("--scale", required=True)
+    parser.add_argument("--data-dir", required=True)
+    parser.add_argument("--seed-only", action="store_true")
+    parser.add_argument("--query-check", action="store_true")
+    parser.add_argument("--transport", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--endpoint", action="append")
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    seeded = seeded_database(args.target, args.scale, args.data_dir)
+    if args.seed_only:
+        return
+    # Every run starts from the pristine seed; writes land in the scratch copy
+    shutil.copyfile(seeded, os.path.join(os.getcwd(), "bench.db"))
+    results = asyncio.run(query_check(args) if args.query_check else run(args))
+    with open(args.out, "w") as f:
+        json.dump(results, f)
+
+
+if __name__ == "__main__":
+    main()
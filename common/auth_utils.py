@@ -1,25 +1,217 @@
-from fastapi import Depends, HTTPException, status
+"""Shared JWT issuing and verification for every service.
+
+Verification is claims-only: a service checks the signature and ``exp``
+locally, with no database round-trip, and keeps verified payloads in a
+small cache keyed by token digest. Keys are configured per key id (``kid``)
+so they can be rotated without invalidating tokens already in flight:
+
+- ``JWT_ALGORITHM``: HS256 (default), HS384/512, RS256/384/512 or ES256/384/512.
+- ``JWT_SECRET``: the single HMAC secret when no key set is configured.
+- ``JWT_KEYS`` (inline JSON) or ``JWT_KEYS_FILE``: ``{"kid": key}``; HMAC
+  secrets for HS*, PEM public keys for RS*/ES*. Every listed kid verifies.
+- ``JWT_ACTIVE_KID``: the kid new tokens are signed with.
+- ``JWT_PRIVATE_KEY`` / ``JWT_PRIVATE_KEY_FILE``: PEM signing key for RS*/ES*;
+  only the issuing service needs it, so verifiers share no secret.
+
+EdDSA is not offered because python-jose does not implement it.
+
+Access tokens are short-lived (``ACCESS_TOKEN_EXPIRE_MINUTES``, default 15)
+and renewed with a refresh token (``REFRESH_TOKEN_EXPIRE_DAYS``, default 7).
+Every token carries a ``jti``; revoked ids live in ``JWT_REVOCATION_FILE``
+(default ``revoked_tokens.jsonl`` at the repo root), which every service
+that verifies tokens must share.
+"""
+import hashlib
+import hmac
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from typing import Optional
-import os
-from dotenv import load_dotenv
 
-# Load environment variables (from root .env)
-load_dotenv()
+from common.cache import TTLCache
+from common.revocation import RevocationList
+from common.timing import timed
 
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
-ALGORITHM = "HS256"
+DEFAULT_KID = "default"
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
 
 # Token URL is only for Swagger docs, not for validation
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def decode_token(token: str) -> Optional[dict]:
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
+
+def _read(value: Optional[str], path: Optional[str]) -> Optional[str]:
+    if path:
+        with open(path) as f:
+            return f.read()
+    return value
+
+
+class KeyRing:
+    def __init__(self, algorithm: str, verification_keys: dict, active_kid: str, signing_key=None):
+        if active_kid not in verification_keys:
+            raise ValueError(f"JWT_ACTIVE_KID {active_kid!r} is not among the configured keys")
+        self.algorithm = algorithm
+        self.verification_keys = verification_keys
+        self.active_kid = active_kid
+        self.signing_key = signing_key
+        if signing_key is None and algorithm.startswith("HS"):
+            self.signing_key = verification_keys[active_kid]
+
+    @classmethod
+    def from_env(cls):
+        algorithm = os.getenv("JWT_ALGORITHM", "HS256")
+        keys = _read(os.getenv("JWT_KEYS"), os.getenv("JWT_KEYS_FILE"))
+        if keys:
+            verification_keys = json.loads(keys)
+            active_kid = os.getenv("JWT_ACTIVE_KID") or next(iter(verification_keys))
+        else:
+            verification_keys = {DEFAULT_KID: os.getenv("JWT_SECRET", "secret")}
+            active_kid = DEFAULT_KID
+        signing_key = _read(os.getenv("JWT_PRIVATE_KEY"), os.getenv("JWT_PRIVATE_KEY_FILE"))
+        return cls(algorithm, verification_keys, active_kid, signing_key)
+
+    def key_for(self, token: str):
+        kid = jwt.get_unverified_header(token).get("kid", self.active_kid)
+        return self.verification_keys.get(kid)
+
+
+@lru_cache(maxsize=1)
+def get_keyring() -> KeyRing:
+    # Built lazily so each app's load_dotenv() has run before the env is read
+    return KeyRing.from_env()
+
+
+# Verified payloads keyed by token digest, so repeat requests skip signature
+# checks. Entries never outlive the token's own "exp".
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+TOKEN_CACHE_MAX_TTL = float(os.getenv("TOKEN_CACHE_MAX_TTL", "300"))
+_verified_tokens = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_MAX_TTL)
+
+
+# Absolute, so services started from their own directories share one file
+DEFAULT_REVOCATION_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "revoked_tokens.jsonl"
+)
+
+
+@lru_cache(maxsize=1)
+def get_revocation_list() -> RevocationList:
+    return RevocationList(os.path.abspath(os.getenv("JWT_REVOCATION_FILE", DEFAULT_REVOCATION_FILE)))
+
+
+def _encode(data: dict, token_type: str, expires_delta: timedelta) -> str:
+    keyring = get_keyring()
+    if keyring.signing_key is None:
+        raise RuntimeError(f"No signing key configured for {keyring.algorithm}")
+    to_encode = data.copy()
+    expire = datetime.now(timezone.utc) + expires_delta
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex, "type": token_type})
+    return jwt.encode(
+        to_encode,
+        keyring.signing_key,
+        algorithm=keyring.algorithm,
+        headers={"kid": keyring.active_kid},
+    )
+
+
+def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
+    if expires_delta is None:
+        expires_delta = timedelta(minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15")))
+    return _encode(data, ACCESS_TOKEN, expires_delta)
+
+
+def create_refresh_token(data: dict, expires_delta: timedelta = None) -> str:
+    if expires_delta is None:
+        expires_delta = timedelta(days=int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7")))
+    return _encode(data, REFRESH_TOKEN, expires_delta)
+
+
+def issue_tokens(claims: dict) -> dict:
+    """Access/refresh pair in the shape of ``schemas.Token``."""
+    return {
+        "access_token": create_access_token(claims),
+        "refresh_token": create_refresh_token(claims),
+        "token_type": "bearer",
+    }
+
+
+def decode_token(token: str, token_type: str = ACCESS_TOKEN) -> Optional[dict]:
+    """Return the verified claims of ``token``, or None if it is invalid, expired,
+    revoked or not of ``token_type``."""
+    with timed("auth"):
+        return _decode_token(token, token_type)
+
+
+def _decode_token(token: str, token_type: str) -> Optional[dict]:
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = _verified_tokens.get(digest)
+    if payload is None:
+        keyring = get_keyring()
+        try:
+            key = keyring.key_for(token)
+            if key is None:
+                return None
+            # Only the configured algorithm is accepted, never the token's own claim
+            payload = jwt.decode(token, key, algorithms=[keyring.algorithm])
+        except JWTError:
+            return None
+        ttl = TOKEN_CACHE_MAX_TTL
+        if "exp" in payload:
+            ttl = min(ttl, payload["exp"] - time.time())
+        if ttl > 0:
+            _verified_tokens.set(digest, payload, ttl=ttl)
+    # Tokens issued before refresh tokens existed carry neither claim
+    if payload.get("type", ACCESS_TOKEN) != token_type:
         return None
+    # Checked on cache hits too, so a revocation takes effect immediately
+    jti = payload.get("jti")
+    if jti is not None and get_revocation_list().is_revoked(jti):
+        return None
+    return payload
+
+
+def revoke_token(payload: dict) -> bool:
+    """Revoke the token; False if it was already revoked."""
+    if payload.get("jti") is None:
+        return True
+    return get_revocation_list().revoke(payload["jti"], payload["exp"])
+
+
+def refresh_tokens(refresh_token: str, claims_for) -> dict:
+    """Rotate ``refresh_token`` for a new pair.
+
+    ``claims_for(user_id)`` returns the current claims, or None when the
+    user is gone. The presented refresh token is revoked, so each one can
+    be used exactly once.
+    """
+    payload = decode_token(refresh_token, REFRESH_TOKEN)
+    if not payload:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+    claims = claims_for(payload.get("user_id"))
+    if claims is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    # Check and revoke in one step, so concurrent refreshes can't both rotate it
+    if not revoke_token(payload):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+    return issue_tokens(claims)
+
+
+def logout(access_payload: dict, refresh_token: Optional[str] = None):
+    """Revoke the caller's access token and, if given, their refresh token."""
+    revoke_token(access_payload)
+    if refresh_token:
+        payload = decode_token(refresh_token, REFRESH_TOKEN)
+        if payload and payload.get("user_id") == access_payload.get("user_id"):
+            revoke_token(payload)
+
 
 def get_current_user(token: str = Depends(oauth2_scheme)):
     payload = decode_token(token)
@@ -30,3 +222,50 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     return payload
+
+
+def require_ops_access(authorization: Optional[str] = Header(None)):
+    """Guard for ``/metrics``, ``/debug/timings`` and ``/cache/stats``.
+
+    The bearer token must be ``OPS_TOKEN`` (for scrapers) or a superadmin
+    access token. ``OPS_ENDPOINTS_PUBLIC=1`` opens them, for deployments
+    that only expose them on an internal port.
+    """
+    if os.getenv("OPS_ENDPOINTS_PUBLIC") == "1":
+        return
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    ops_token = os.getenv("OPS_TOKEN")
+    if ops_token and hmac.compare_digest(token.encode(), ops_token.encode()):
+        return
+    payload = decode_token(token)
+    if not payload or payload.get("role") != "superadmin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
+
+
+class UserHydrator:
+    """Optional claims -> user lookup with a short-lived cache.
+
+    ``load(user_id)`` should return a plain snapshot (not an ORM instance)
+    or None when the user no longer exists; missing users are not cached.
+    """
+
+    def __init__(self, load, ttl: float = 60.0, maxsize: int = 4096):
+        self.load = load
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def __call__(self, user_id):
+        user = self.cache.get(user_id)
+        if user is None:
+            user = self.load(user_id)
+            if user is not None:
+                self.cache.set(user_id, user)
+        return user
+
+    def invalidate(self, user_id):
+        self.cache.delete(user_id)
@@ -0,0 +1,242 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import redis
+except ImportError:  # redis is optional; the local backend needs nothing extra
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# ---------- Backends ----------
+class LocalBackend:
+    """Per-process backend. Group versions live outside the LRU so they are never evicted."""
+
+    # Calls never wait on I/O, so async callers may make them on the event loop
+    blocking = False
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.store = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.store.set(key, value, ttl=ttl)
+
+    def get_version(self, key):
+        return self._versions.get(key, 0)
+
+    def bump_version(self, key):
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            return self._versions[key]
+
+    def size(self):
+        return len(self.store)
+
+
+class RedisBackend:
+    """Backend shared by every worker through a Redis-protocol server.
+
+    Accepts any client exposing ``get``/``set``/``incr`` (redis-py,
+    ``fakeredis.FakeRedis()`` in tests). Invalidation is a versioned key: an
+    INCR on the group's version makes all workers miss on their next read,
+    so no pub/sub fan-out is needed. Server errors degrade to cache misses.
+    """
+
+    # Every call is a network round-trip; async callers run them in the threadpool
+    blocking = True
+
+    def __init__(self, client, ttl: float = 60.0):
+        self.client = client
+        # Redis expiries are whole seconds and must be positive
+        self.ttl = max(1, math.ceil(ttl))
+        self._errors = (redis.RedisError,) if redis is not None else (ConnectionError, OSError)
+
+    def get(self, key):
+        try:
+            raw = self.client.get(key)
+        except self._errors:
+            logger.warning("cache get failed for %s", key, exc_info=True)
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        try:
+            self.client.set(key, json.dumps(value), ex=max(1, math.ceil(ttl)) if ttl else self.ttl)
+        except self._errors:
+            logger.warning("cache set failed for %s", key, exc_info=True)
+
+    def get_version(self, key):
+        try:
+            raw = self.client.get(key)
+            if raw is None:
+                # Seed missing (or evicted) versions from the clock so a reset
+                # can never resurrect entries written under an older version.
+                self.client.set(key, time.time_ns(), nx=True)
+                raw = self.client.get(key)
+        except self._errors:
+            logger.warning("cache version lookup failed for %s", key, exc_info=True)
+            return None
+        return int(raw)
+
+    def bump_version(self, key):
+        # Called after the writer has committed, so a failure must not fail the request
+        try:
+            self.get_version(key)
+            return self.client.incr(key)
+        except self._errors:
+            logger.error("cache invalidation failed for %s", key, exc_info=True)
+            return None
+
+    def size(self):
+        return None
+
+
+class ReadThroughCache:
+    """Caches loader results grouped by an owner key such as a restaurant id.
+
+    ``invalidate(group)`` bumps the group's version so every entry cached for
+    it becomes unreachable at once; stale entries age out through the TTL.
+    Values should be plain JSON-compatible data, never ORM objects.
+    """
+
+    def __init__(self, name: str, backend=None):
+        self.name = name
+        self.backend = backend if backend is not None else LocalBackend()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Sync handlers update the counters from several threadpool threads
+        self._stats_lock = threading.Lock()
+
+    def _version_key(self, group):
+        return f"{self.name}:v:{group}"
+
+    def _lookup(self, group, name, refresh=False):
+        version = self.backend.get_version(self._version_key(group))
+        key = f"{self.name}:{group}:{version}:{name}" if version is not None else None
+        value = self.backend.get(key) if key is not None and not refresh else None
+        with self._stats_lock:
+            if value is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return key, value
+
+    def _store(self, key, value, ttl):
+        if value is not None and key is not None:
+            self.backend.set(key, value, ttl=ttl)
+        return value
+
+    def get_or_load(self, group, name, loader, ttl=None, refresh=False):
+        """``ttl`` overrides the backend's TTL for a value loaded by this call;
+        ``refresh`` skips the lookup and always loads (and re-caches) the value."""
+        key, value = self._lookup(group, name, refresh)
+        if value is not None:
+            return value
+        # Loader exceptions (e.g. a 404) propagate and nothing is cached
+        return self._store(key, loader(), ttl)
+
+    async def _offload(self, fn, *args):
+        if self.backend.blocking:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    async def aget_or_load(self, group, name, loader, ttl=None, refresh=False):
+        """``get_or_load`` for an async ``loader``; backend I/O stays off the event loop."""
+        key, value = await self._offload(self._lookup, group, name, refresh)
+        if value is not None:
+            return value
+        return await self._offload(self._store, key, await loader(), ttl)
+
+    def invalidate(self, group):
+        self.backend.bump_version(self._version_key(group))
+        with self._stats_lock:
+            self.invalidations += 1
+
+    async def ainvalidate(self, group):
+        """``invalidate`` for async handlers."""
+        await self._offload(self.invalidate, group)
+
+    def stats(self):
+        with self._stats_lock:
+            hits, misses, invalidations = self.hits, self.misses, self.invalidations
+        lookups = hits + misses
+        return {
+            "name": self.name,
+            "backend": type(self.backend).__name__,
+            "entries": self.backend.size(),
+            "hits": hits,
+            "misses": misses,
+            "invalidations": invalidations,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def backend_from_env():
+    """A RedisBackend for CACHE_URL (``redis://...``), else an in-process LocalBackend."""
+    ttl = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+    url = os.getenv("CACHE_URL")
+    if url:
+        if redis is None:
+            raise RuntimeError("CACHE_URL is set but the 'redis' package is not installed")
+        return RedisBackend(redis.Redis.from_url(url), ttl=ttl)
+    return LocalBackend(maxsize=int(os.getenv("CACHE_MAX_ENTRIES", "2048")), ttl=ttl)
+
+
+def cache_from_env(name: str) -> ReadThroughCache:
+    """Build a cache from CACHE_URL or fall back to in-process memory."""
+    return ReadThroughCache(name, backend_from_env())
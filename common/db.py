@@ -0,0 +1,300 @@
+"""Engine construction shared by every app's ``database.py``.
+
+``DATABASE_URL`` selects the database; ``postgres://`` URLs are accepted
+and rewritten to ``postgresql://``. Pool settings apply to any pooled
+engine:
+
+- ``DB_POOL_SIZE`` (5), ``DB_MAX_OVERFLOW`` (10), ``DB_POOL_TIMEOUT`` (30s)
+- ``DB_POOL_RECYCLE`` (1800s): reconnect before servers or proxies drop idle connections
+- ``DB_POOL_PRE_PING`` (1): check a connection on checkout instead of failing the request
+
+SQLite connections are opened in WAL mode so readers never block behind a
+writer, with ``synchronous=NORMAL`` (durable in WAL, far fewer fsyncs), a
+busy timeout so concurrent writers wait instead of raising "database is
+locked", and memory-mapped reads:
+
+- ``SQLITE_BUSY_TIMEOUT_MS`` (5000), ``SQLITE_MMAP_SIZE`` (268435456),
+  ``SQLITE_SYNCHRONOUS`` (NORMAL), ``SQLITE_CACHE_SIZE_KB`` (20000)
+
+Read replicas are listed in ``DATABASE_REPLICA_URLS`` (comma-separated);
+see ``ReadRouter``.
+
+Writes go through ``commit_returning`` instead of ``commit()`` + ``refresh()``.
+"""
+import itertools
+import os
+from typing import Optional
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm.attributes import set_committed_value
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+
+from common.cache import backend_from_env
+
+
+def normalize_url(url: str) -> str:
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+def database_url(default: str) -> str:
+    return normalize_url(os.getenv("DATABASE_URL", default))
+
+
+def is_sqlite(url) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _is_memory(url) -> bool:
+    return make_url(url).database in (None, "", ":memory:")
+
+
+def engine_options(url: str) -> dict:
+    """``create_engine`` / ``create_async_engine`` keyword arguments for ``url``."""
+    options = {"pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1") == "1"}
+    if is_sqlite(url):
+        if make_url(url).get_driver_name() == "aiosqlite":
+            # Its default pool class differs across SQLAlchemy releases; keep the default
+            return options
+        # FastAPI's threadpool hands connections between threads
+        options["connect_args"] = {"check_same_thread": False}
+        if _is_memory(url):
+            # In-memory databases use a single-connection pool; sizing does not apply
+            return options
+    options.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    )
+    return options
+
+
+def install_sqlite_pragmas(engine):
+    """Apply the SQLite pragmas to every new DBAPI connection of ``engine`` (sync or async)."""
+    pragmas = [
+        ("busy_timeout", int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))),
+        ("synchronous", os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")),
+        ("mmap_size", int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))),
+        # Negative cache_size is in KiB rather than pages
+        ("cache_size", -int(os.getenv("SQLITE_CACHE_SIZE_KB", "20000"))),
+    ]
+    if not _is_memory(engine.url):
+        # WAL is persistent in the file, but setting it again is a cheap no-op
+        pragmas.insert(0, ("journal_mode", "WAL"))
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return engine
+
+
+def make_engine(url: str, **kwargs):
+    options = engine_options(url)
+    options.update(kwargs)
+    engine = create_engine(url, **options)
+    if is_sqlite(url):
+        install_sqlite_pragmas(engine)
+    return engine
+
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def _new(objs) -> list:
+    return [obj for obj in objs if inspect(obj).transient or inspect(obj).pending]
+
+
+def _empty_collections(objs):
+    # A row inserted by this flush has no children yet; without this each
+    # collection the response reads would be lazy loaded with a SELECT
+    for obj in objs:
+        state = inspect(obj)
+        for rel in state.mapper.relationships:
+            if rel.uselist and rel.key in state.unloaded:
+                set_committed_value(obj, rel.key, [])
+
+
+def commit_returning(db, *objs):
+    """Add and commit ``objs`` and return them still loaded, in place of
+    ``commit()`` followed by ``refresh()``.
+
+    The flush already leaves the written columns on the objects: primary
+    keys come back from the INSERT (via RETURNING where the dialect has it)
+    and Python-side ``default=`` values are applied before the statement
+    runs. Only commit's expiry would force the reload, so this commit skips
+    it. Server-side defaults and triggers are *not* fetched; no model here
+    uses them, and one that does needs ``eager_defaults`` on its mapper or
+    a plain ``refresh()``.
+    """
+    new = _new(objs)
+    db.add_all(objs)
+    db.flush()
+    _empty_collections(new)
+    expire, db.expire_on_commit = db.expire_on_commit, False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire
+    return objs[0] if len(objs) == 1 else objs
+
+
+async def acommit_returning(db, *objs):
+    """``commit_returning`` for an ``AsyncSession``."""
+    new = _new(objs)
+    db.add_all(objs)
+    await db.flush()
+    _empty_collections(new)
+    sync_session = db.sync_session
+    expire, sync_session.expire_on_commit = sync_session.expire_on_commit, False
+    try:
+        await db.commit()
+    finally:
+        sync_session.expire_on_commit = expire
+    return objs[0] if len(objs) == 1 else objs
+
+
+def _replica_sessionmaker(url: str) -> sessionmaker:
+    return sessionmaker(autocommit=False, autoflush=False, bind=make_engine(url), info={"replica": True})
+
+
+def _request_user(headers) -> Optional[str]:
+    """The ``user_id`` of a valid bearer token in ``headers``, if any."""
+    scheme, _, token = (headers.get("authorization") or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    # Imported here: the auth module is only needed once replicas are configured
+    from common.auth_utils import decode_token
+
+    payload = decode_token(token)
+    user_id = payload.get("user_id") if payload else None
+    return None if user_id is None else str(user_id)
+
+
+class ReadRouter:
+    """Sends read-only endpoints to replicas, round-robin, with read-your-writes.
+
+    After a successful non-GET response the client is pinned to the primary
+    for ``REPLICA_STICKY_SECONDS`` (default 10), so it sees its own writes
+    despite replica lag: browsers through a short-lived cookie, API clients
+    through their authenticated user id, recorded in the CACHE_URL backend
+    (in-process memory without one). With no replicas configured every read
+    uses the primary.
+
+    Cached reads go through ``cache_options(db)``: values read from a replica
+    may lag the invalidation that caused the cache miss, so they are cached
+    for only ``REPLICA_CACHE_TTL`` seconds (default 5); a pinned client skips
+    the cache lookup entirely, since a lagging replica read may have filled
+    the entry after its write, and re-caches what it read from the primary.
+    """
+
+    COOKIE = "db_primary"
+
+    def __init__(
+        self, primary, replica_urls=(), sticky_seconds: int = 10, cache_ttl: float = 5.0, replica_factory=None,
+        sticky_store=None,
+    ):
+        # replica_factory(url) -> session factory; async apps pass one building async_sessionmakers
+        self.primary = primary
+        self.replicas = [(replica_factory or _replica_sessionmaker)(url) for url in replica_urls]
+        self._next_replica = itertools.cycle(self.replicas) if self.replicas else None
+        self.sticky_seconds = sticky_seconds
+        self.replica_cache_ttl = cache_ttl
+        # Any cache backend (get/set with ttl); routers of one app pass the same store
+        if sticky_store is None and self.replicas:
+            sticky_store = backend_from_env()
+        self.sticky_store = sticky_store
+
+    @classmethod
+    def from_env(cls, primary, replica_factory=None, sticky_store=None):
+        urls = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+        return cls(
+            primary,
+            replica_urls=[normalize_url(u) for u in urls],
+            sticky_seconds=int(os.getenv("REPLICA_STICKY_SECONDS", "10")),
+            cache_ttl=float(os.getenv("REPLICA_CACHE_TTL", "5")),
+            replica_factory=replica_factory,
+            sticky_store=sticky_store,
+        )
+
+    def _sticky_key(self, user_id: str) -> str:
+        return f"{self.COOKIE}:{user_id}"
+
+    def mark_sticky(self, headers):
+        """Pin the user authenticated by ``headers`` to the primary; may block on the store."""
+        user_id = _request_user(headers)
+        if user_id is not None:
+            self.sticky_store.set(self._sticky_key(user_id), 1, ttl=self.sticky_seconds)
+
+    def is_sticky(self, request) -> bool:
+        """Whether ``request`` must read from the primary; may block on the store."""
+        if request.cookies.get(self.COOKIE):
+            return True
+        user_id = _request_user(request.headers)
+        return user_id is not None and bool(self.sticky_store.get(self._sticky_key(user_id)))
+
+    def session(self, request, sticky: bool = None):
+        """A read session for ``request``; async callers resolve ``sticky`` off the event loop."""
+        if self._next_replica is None:
+            return self.primary()
+        if sticky is None:
+            sticky = self.is_sticky(request)
+        if not sticky:
+            return next(self._next_replica)()
+        db = self.primary()
+        db.info["sticky"] = True
+        return db
+
+    def cache_options(self, db) -> dict:
+        """Keyword arguments for ``ReadThroughCache.get_or_load`` reading through ``db``."""
+        if db.info.get("replica"):
+            return {"ttl": self.replica_cache_ttl}
+        if db.info.get("sticky"):
+            return {"refresh": True}
+        return {}
+
+    def engines(self) -> dict:
+        """The primary and replica engines by name, for instrumentation."""
+        named = {"primary": self.primary.kw["bind"]}
+        named.update((f"replica{i}", maker.kw["bind"]) for i, maker in enumerate(self.replicas))
+        return named
+
+
+class StickyPrimaryMiddleware:
+    """Marks a client sticky to the primary after a successful write.
+
+    ``app.add_middleware(StickyPrimaryMiddleware, read_router=read_router)``
+    """
+
+    def __init__(self, app, read_router: ReadRouter):
+        self.app = app
+        self.read_router = read_router
+        self.enabled = bool(read_router.replicas)
+        self.cookie = (
+            f"{ReadRouter.COOKIE}=1; Max-Age={read_router.sticky_seconds}; Path=/; HttpOnly; SameSite=Lax"
+        ).encode()
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            return await self.app(scope, receive, send)
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", self.cookie)]
+                # Bearer-token clients ignore cookies; pin their user before the response goes out
+                await run_in_threadpool(self.read_router.mark_sticky, Headers(scope=scope))
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
@@ -0,0 +1,50 @@
+"""EXPLAIN-based check that hot queries are served by the expected index.
+
+Each app lists its hot queries as ``(description, statement, index_name)``
+and calls ``main``. By default the configured database is checked (run it
+after ``alembic upgrade head``); ``--scratch`` builds the schema from the
+models in an in-memory SQLite database instead, which needs no server.
+
+On Postgres, sequential scans are disabled for the check so small or
+empty tables do not hide a missing index behind a cheaper seq scan.
+"""
+import argparse
+
+from sqlalchemy import create_engine
+
+
+def explain(conn, stmt) -> str:
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+        return "\n".join(str(row[-1]) for row in rows)
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    return "\n".join(str(row[0]) for row in conn.exec_driver_sql(f"EXPLAIN {sql}").all())
+
+
+def check(engine, queries) -> list:
+    """Return ``(description, index_name, plan)`` for every query not using its index."""
+    failures = []
+    with engine.begin() as conn:
+        for description, stmt, index_name in queries:
+            plan = explain(conn, stmt)
+            if index_name not in plan:
+                failures.append((description, index_name, plan))
+    return failures
+
+
+def main(engine, metadata, queries) -> int:
+    parser = argparse.ArgumentParser(description="Check that hot queries use an index")
+    parser.add_argument("--scratch", action="store_true", help="check a throwaway SQLite schema built from the models")
+    args = parser.parse_args()
+
+    if args.scratch:
+        engine = create_engine("sqlite://")
+        metadata.create_all(engine)
+    failures = check(engine, queries)
+    for description, stmt, index_name in queries:
+        print(f"{'FAIL' if any(f[0] == description for f in failures) else 'ok':<6}{description} [{index_name}]")
+    for description, index_name, plan in failures:
+        print(f"\n{description}: expected {index_name}\n{plan}")
+    return 1 if failures else 0
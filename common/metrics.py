@@ -0,0 +1,217 @@
+"""Prometheus text-format metrics served at ``GET /metrics``.
+
+Request metrics are recorded by ``common.timing.TimingMiddleware``, which
+already knows each request's route template and SQL statement count:
+
+- ``http_requests_total{method,route,status}``
+- ``http_request_duration_seconds{method,route}`` (histogram)
+- ``http_requests_in_flight``
+- ``db_queries_per_request{method,route}`` (histogram), counted from
+  ``before_cursor_execute``; a jump on one route is usually an N+1
+- ``db_pool_checkout_wait_seconds{engine}`` (histogram) and
+  ``db_pool_checked_out{engine}``
+
+The endpoint is guarded by the dependencies passed to ``install``; the
+services use ``common.auth_utils.require_ops_access``, so scrapers send
+``OPS_TOKEN`` as a bearer token.
+
+Values are per process; with several uvicorn workers each scrape sees one
+worker, so scrape every worker or aggregate by instance.
+"""
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = []
+# name -> callable returning [(labels, value)], read at scrape time
+_gauge_callbacks = {}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples()]
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        callback = _gauge_callbacks.get(self.name)
+        if callback is not None:
+            items += [(self._key(labels), value) for labels, value in callback()]
+        return [(self.name, _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        samples = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = _format_value(bound)
+                samples.append((f"{self.name}_bucket", _format_labels(self.labelnames, key, [("le", le)]), cumulative))
+            labels = _format_labels(self.labelnames, key)
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+def render() -> str:
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+# ---------- Metrics ----------
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+REQUESTS = Counter("http_requests_total", "HTTP requests handled.", ("method", "route", "status"))
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route"), LATENCY_BUCKETS
+)
+IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being handled.")
+QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request.", ("method", "route"), QUERY_BUCKETS
+)
+POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection.", ("engine",), POOL_WAIT_BUCKETS
+)
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Pooled DB connections currently checked out.", ("engine",))
+
+
+def observe_request(method: str, route: str, status: int, seconds: float, queries: int):
+    REQUESTS.inc(method=method, route=route, status=status)
+    REQUEST_DURATION.observe(seconds, method=method, route=route)
+    QUERIES_PER_REQUEST.observe(queries, method=method, route=route)
+
+
+# ---------- Pools ----------
+_pools = {}
+
+
+def instrument_pool(name: str, engine):
+    """Time connection checkouts from ``engine``'s pool.
+
+    The pool has no event that fires before a checkout starts waiting, so
+    its ``connect`` is wrapped; new connections count their connect time.
+    """
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - started, engine=name)
+
+    pool.connect = timed_connect
+    _pools[name] = pool
+
+
+def _checked_out():
+    # Only QueuePool and its async variant track checkouts
+    return [
+        ({"engine": name}, pool.checkedout())
+        for name, pool in _pools.items()
+        if hasattr(pool, "checkedout")
+    ]
+
+
+_gauge_callbacks[POOL_CHECKED_OUT.name] = _checked_out
+
+
+def install(app: FastAPI, engines: dict, dependencies=()):
+    """Serve ``/metrics`` and time checkouts for ``engines`` ({name: engine}).
+
+    ``dependencies`` guard the endpoint, as for ``common.timing.install``.
+    """
+    for name, engine in engines.items():
+        # An AsyncEngine's pool lives on its sync engine
+        instrument_pool(name, getattr(engine, "sync_engine", engine))
+
+    @app.get("/metrics", include_in_schema=False, dependencies=list(dependencies))
+    def metrics():
+        return PlainTextResponse(render(), media_type=CONTENT_TYPE)
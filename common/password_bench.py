@@ -0,0 +1,86 @@
+"""Measure password hashing throughput per hashing profile.
+
+Run from the repository root::
+
+    python -m common.password_bench                  # built-in profiles
+    python -m common.password_bench --seconds 5 --workers 8
+
+For each profile it reports single-core hashes/sec and the aggregate rate
+with one worker process per core, which is what sizes an auth fleet:
+logins/sec per instance ~= aggregate rate, assuming verification dominates.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from common.passwords import build_context
+
+PROFILES = {
+    "bcrypt-10": {"scheme": "bcrypt", "bcrypt_rounds": 10},
+    "bcrypt-11": {"scheme": "bcrypt", "bcrypt_rounds": 11},
+    "bcrypt-12": {"scheme": "bcrypt", "bcrypt_rounds": 12},
+    "bcrypt-13": {"scheme": "bcrypt", "bcrypt_rounds": 13},
+    "argon2-19m-t2": {"scheme": "argon2", "argon2_memory_cost": 19456, "argon2_time_cost": 2, "argon2_parallelism": 1},
+    "argon2-64m-t3": {"scheme": "argon2", "argon2_memory_cost": 65536, "argon2_time_cost": 3, "argon2_parallelism": 4},
+}
+
+
+def _hashes_per_second(profile: dict, seconds: float) -> float:
+    context = build_context(**profile)
+    context.hash("warmup")
+    count = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        context.hash("correct horse battery staple")
+        count += 1
+    return count / (time.perf_counter() - started)
+
+
+def run(profiles: dict, seconds: float, workers: int) -> dict:
+    results = {}
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        for name, profile in profiles.items():
+            try:
+                single = _hashes_per_second(profile, seconds)
+            except Exception as exc:  # e.g. argon2-cffi not installed
+                results[name] = {"error": str(exc)}
+                continue
+            rates = list(pool.map(_hashes_per_second, [profile] * workers, [seconds] * workers))
+            results[name] = {
+                "ms_per_hash": round(1000 / single, 1),
+                "single_core_per_sec": round(single, 1),
+                "per_core_per_sec": round(sum(rates) / workers, 1),
+                "aggregate_per_sec": round(sum(rates), 1),
+                "workers": workers,
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=2.0, help="measurement time per profile")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--profile", action="append", choices=sorted(PROFILES), help="limit to these profiles")
+    parser.add_argument("--json", action="store_true", help="print raw JSON")
+    args = parser.parse_args()
+
+    selected = {name: PROFILES[name] for name in (args.profile or PROFILES)}
+    results = run(selected, args.seconds, args.workers)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'profile':<16}{'ms/hash':>10}{'1-core/s':>12}{'per-core/s':>12}{'total/s':>10}")
+    for name, r in results.items():
+        if "error" in r:
+            print(f"{name:<16}  unavailable: {r['error']}")
+            continue
+        print(f"{name:<16}{r['ms_per_hash']:>10}{r['single_core_per_sec']:>12}"
+              f"{r['per_core_per_sec']:>12}{r['aggregate_per_sec']:>10}")
+
+
+if __name__ == "__main__":
+    main()
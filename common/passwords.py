@@ -0,0 +1,135 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from common.timing import timed
+
+SCHEMES = ("bcrypt", "argon2")
+
+
+def build_context(
+    scheme: str = "bcrypt",
+    bcrypt_rounds: int = 12,
+    argon2_memory_cost: int = 65536,
+    argon2_time_cost: int = 3,
+    argon2_parallelism: int = 4,
+) -> CryptContext:
+    """Hash with ``scheme`` at exactly these costs; anything else is flagged for rehash.
+
+    Every scheme stays verifiable so switching policy never locks users out,
+    and pinning min/max to the configured cost makes ``verify_and_update``
+    migrate hashes in both directions when the cost is raised or lowered.
+    """
+    if scheme not in SCHEMES:
+        raise ValueError(f"Unsupported password scheme {scheme!r}, expected one of {SCHEMES}")
+    return CryptContext(
+        schemes=[scheme] + [s for s in SCHEMES if s != scheme],
+        deprecated=[s for s in SCHEMES if s != scheme],
+        bcrypt__default_rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__time_cost=argon2_time_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+def context_from_env() -> CryptContext:
+    return build_context(
+        scheme=os.getenv("PASSWORD_SCHEME", "bcrypt"),
+        bcrypt_rounds=int(os.getenv("BCRYPT_ROUNDS", "12")),
+        argon2_memory_cost=int(os.getenv("ARGON2_MEMORY_COST", "65536")),
+        argon2_time_cost=int(os.getenv("ARGON2_TIME_COST", "3")),
+        argon2_parallelism=int(os.getenv("ARGON2_PARALLELISM", "4")),
+    )
+
+
+# Worker processes inherit the environment, so they build the same policy
+pwd_context = context_from_env()
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    if not hashed_password:
+        # Social and admin-created accounts have no password to check
+        return False
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def verify_and_update(plain_password: str, hashed_password: str):
+    """Return ``(valid, new_hash)``; ``new_hash`` is set when the stored hash is off-policy."""
+    if not hashed_password:
+        return False, None
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasherPool:
+    """Runs password hashing in worker processes, off the event loop and threadpool.
+
+    bcrypt costs 100-300ms of CPU per call; in a process pool throughput
+    scales with cores instead of queueing behind the GIL or starving
+    FastAPI's threadpool. At most ``max_pending`` calls may be queued or
+    running; beyond that callers get 503 with Retry-After so a login burst
+    sheds load instead of stalling every other endpoint.
+    """
+
+    def __init__(self, max_workers: int = None, max_pending: int = None, retry_after: int = 1):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 4
+        self.retry_after = retry_after
+        self.pending = 0
+        self._executor = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", "0")) or None,
+            max_pending=int(os.getenv("PASSWORD_HASH_MAX_PENDING", "0")) or None,
+            retry_after=int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "1")),
+        )
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn: forking a process that runs threadpool workers is not safe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        # Only touched from the event loop thread, so a plain counter is enough
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is busy, retry shortly",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            with timed("auth"):
+                return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str):
+        return await self._run(verify_and_update, plain_password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,184 @@
+"""Catches N+1 queries by counting the SQL each request issues.
+
+Requests are attributed by wrapping an app's session dependencies
+(``get_db``, ``get_read_db``, ...) through ``dependency_overrides``; every
+statement executed while a wrapped session is open counts against that
+request. A request fails its ``QueryBudget`` when it issues more than
+``max_queries`` statements, or repeats one statement shape (literals and
+bound parameters stripped) more than ``max_repeats`` times, which is how
+a lazy load inside a loop shows up.
+
+As a pytest plugin (loaded by the root ``conftest.py``)::
+
+    @pytest.mark.query_budget(max_queries=3, max_repeats=1)
+    def test_list_restaurants(client, query_budget):
+        with query_budget(client.app, get_db, get_read_db):
+            client.get("/restaurant/")
+
+Statements are recorded process-wide, so requests must run one at a time,
+as they do under TestClient.
+"""
+import re
+import threading
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from functools import wraps
+from inspect import isasyncgenfunction
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+# Named, pyformat, numeric ($1) and qmark parameters
+_PARAM = re.compile(r"%\(\w+\)s|%s|:\w+|\$\d+|\?")
+_PARAM_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(statement: str) -> str:
+    """The statement's shape: literals and parameters become ``?`` and IN
+    lists of any length collapse to one, so repeated lookups compare equal."""
+    shape = _STRING.sub("?", statement)
+    shape = _PARAM.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _PARAM_LIST.sub("(?)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+class QueryLog:
+    """Every statement executed on any engine while capturing."""
+
+    def __init__(self):
+        self.statements = []
+        self._lock = threading.Lock()
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.statements.append(statement)
+
+    def __len__(self):
+        return len(self.statements)
+
+    def since(self, start: int) -> list:
+        with self._lock:
+            return self.statements[start:]
+
+
+@contextmanager
+def capture():
+    log = QueryLog()
+    event.listen(Engine, "before_cursor_execute", log._record)
+    try:
+        yield log
+    finally:
+        event.remove(Engine, "before_cursor_execute", log._record)
+
+
+class QueryBudget(NamedTuple):
+    max_queries: Optional[int] = None
+    max_repeats: Optional[int] = None
+
+    def violations(self, statements) -> list:
+        problems = []
+        if self.max_queries is not None and len(statements) > self.max_queries:
+            problems.append(f"{len(statements)} statements, budget {self.max_queries}")
+        if self.max_repeats is not None:
+            for shape, count in Counter(normalize(s) for s in statements).most_common():
+                if count <= self.max_repeats:
+                    break
+                problems.append(f"{count}x (budget {self.max_repeats}): {shape}")
+        return problems
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def _counting(dependency, log: QueryLog, requests: list):
+    """Wrap a yield-style session dependency so each call records its statements."""
+    if isasyncgenfunction(dependency):
+        managed = asynccontextmanager(dependency)
+
+        @wraps(dependency)
+        async def wrapper(*args, **kwargs):
+            start = len(log)
+            try:
+                async with managed(*args, **kwargs) as db:
+                    yield db
+            finally:
+                requests.append(log.since(start))
+    else:
+        managed = contextmanager(dependency)
+
+        @wraps(dependency)
+        def wrapper(*args, **kwargs):
+            start = len(log)
+            try:
+                with managed(*args, **kwargs) as db:
+                    yield db
+            finally:
+                requests.append(log.since(start))
+
+    return wrapper
+
+
+@contextmanager
+def guard(app, budget: QueryBudget, *dependencies):
+    """Fail with ``QueryBudgetExceeded`` if any request inside the block
+    breaks ``budget``. Yields the list of per-request statement lists.
+
+    A request using two wrapped dependencies counts the overlap in both.
+    """
+    requests = []
+    saved = {dep: app.dependency_overrides.get(dep) for dep in dependencies}
+    with capture() as log:
+        for dep in dependencies:
+            app.dependency_overrides[dep] = _counting(saved[dep] or dep, log, requests)
+        try:
+            yield requests
+        finally:
+            for dep, previous in saved.items():
+                if previous is None:
+                    app.dependency_overrides.pop(dep, None)
+                else:
+                    app.dependency_overrides[dep] = previous
+
+    problems = []
+    for n, statements in enumerate(requests, 1):
+        problems += [f"request {n}: {problem}" for problem in budget.violations(statements)]
+    if problems:
+        raise QueryBudgetExceeded("query budget exceeded:\n  " + "\n  ".join(problems))
+
+
+# ---------- pytest plugin ----------
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "query_budget(max_queries=None, max_repeats=None): SQL budget per request for query_budget"
+    )
+
+
+try:
+    import pytest
+except ImportError:
+    pytest = None
+
+if pytest is not None:
+    @pytest.fixture
+    def query_budget(request):
+        """``query_budget(app, *dependencies, **overrides)`` -> ``guard``, with
+        limits taken from the test's ``query_budget`` marker."""
+        marker = request.node.get_closest_marker("query_budget")
+        defaults = dict(marker.kwargs) if marker else {}
+
+        def make(app, *dependencies, **overrides):
+            return guard(app, QueryBudget(**{**defaults, **overrides}), *dependencies)
+
+        return make
+
+    @pytest.fixture
+    def query_log():
+        """Every statement the test executes, on any engine."""
+        with capture() as log:
+            yield log
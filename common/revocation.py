@@ -0,0 +1,168 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001):
+        # Standard sizing: m = -n ln p / (ln 2)^2, k = m/n ln 2
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.sha256(item.encode()).digest()
+        # Kirsch-Mitzenmacher: derive k positions from two 64-bit hashes
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationList:
+    """Revoked token ids (``jti``), checked in O(1) on every verification.
+
+    The bloom filter answers the common "not revoked" case without touching
+    the exact set; a positive is confirmed against ``jti -> exp``. Entries are
+    appended to a JSON Lines file shared by every process; each process reads
+    only the lines appended since its last look, and picks up revocations made
+    elsewhere within ``reload_interval`` seconds.
+
+    ``revoke`` holds an exclusive ``flock`` on ``<path>.lock`` while it
+    catches up with the file, checks and appends, so exactly one caller in the
+    fleet wins a given jti. Expired entries are dropped by ``compact``, which
+    runs at startup and then every ``compact_interval`` seconds.
+    """
+
+    def __init__(
+        self, path: str, capacity: int = 100_000, reload_interval: float = 5.0, compact_interval: float = 3600.0,
+    ):
+        self.path = path
+        self.capacity = capacity
+        self.reload_interval = reload_interval
+        self.compact_interval = compact_interval
+        self._lock = threading.Lock()
+        # (inode, size, mtime_ns) of the file as last read, and how far into it we are
+        self._signature = None
+        self._offset = 0
+        self._checked_at = 0.0
+        self._compacted_at = 0.0
+        self.bloom = BloomFilter(capacity)
+        self.revoked = {}
+        self.compact()
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:  # No flock (Windows): only threads of one process are serialized
+            yield
+            return
+        with open(self.path + ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def load(self):
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        """Catch up with the file; the caller holds ``_lock``."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            st = None
+        signature = st and (st.st_ino, st.st_size, st.st_mtime_ns)
+        self._checked_at = time.monotonic()
+        if signature == self._signature:
+            return
+        if st is not None and self._signature is not None and st.st_ino == self._signature[0] \
+                and st.st_size >= self._offset:
+            # Only appended to since the last read: parse just the new lines.
+            # Entries are only ever added, so concurrent checks stay correct.
+            bloom, revoked, offset = self.bloom, self.revoked, self._offset
+        else:
+            # New or replaced (compacted) file: build aside and swap, so
+            # concurrent checks never see a half-filled filter
+            bloom, revoked, offset = BloomFilter(self.capacity), {}, 0
+        if st is not None:
+            now = time.time()
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+            # A line another process is still writing is picked up next time
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    jti, exp = entry["jti"], float(entry["exp"])
+                except (ValueError, TypeError, KeyError):
+                    logger.warning("skipping unreadable entry in %s: %r", self.path, line[:200])
+                    continue
+                if exp > now:
+                    revoked[jti] = exp
+                    bloom.add(jti)
+            offset += end
+        self.bloom, self.revoked = bloom, revoked
+        self._signature, self._offset = signature, offset
+
+    def _reload_if_changed(self):
+        if time.monotonic() - self._checked_at < self.reload_interval:
+            return
+        self.load()
+
+    def revoke(self, jti: str, exp: float) -> bool:
+        """Revoke ``jti``; False if it already was, so exactly one caller wins."""
+        if time.monotonic() - self._compacted_at >= self.compact_interval:
+            self.compact()
+        with self._lock, self._file_lock():
+            # Catch revocations other processes made since the last read
+            self._sync()
+            if jti in self.revoked:
+                return False
+            with open(self.path, "a") as f:
+                f.write(json.dumps({"jti": jti, "exp": exp}) + "\n")
+            # Reads back just our own line: nobody else can append while we hold the lock
+            self._sync()
+            return True
+
+    def is_revoked(self, jti: str) -> bool:
+        self._reload_if_changed()
+        if jti not in self.bloom:
+            return False
+        return jti in self.revoked
+
+    def compact(self):
+        """Rewrite the file without expired or unreadable entries."""
+        with self._lock, self._file_lock():
+            self._compacted_at = time.monotonic()
+            self._sync()
+            if self._signature is None:
+                return
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                for jti, exp in self.revoked.items():
+                    f.write(json.dumps({"jti": jti, "exp": exp}) + "\n")
+            os.replace(tmp_path, self.path)
+            self._sync()
@@ -0,0 +1,40 @@
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from common.cache import ReadThroughCache, RedisBackend
+
+
+@pytest.fixture
+def workers():
+    """Two caches sharing one Redis, as two worker processes would."""
+    client = fakeredis.FakeRedis()
+    return ReadThroughCache("test", RedisBackend(client)), ReadThroughCache("test", RedisBackend(client))
+
+
+def test_entries_are_shared_between_workers(workers):
+    first, second = workers
+    assert first.get_or_load(1, "detail", lambda: {"name": "old"}) == {"name": "old"}
+    assert second.get_or_load(1, "detail", lambda: pytest.fail("should be a hit")) == {"name": "old"}
+    assert second.stats()["hits"] == 1
+
+
+def test_invalidation_in_one_worker_reaches_the_other(workers):
+    first, second = workers
+    first.get_or_load(1, "detail", lambda: {"name": "old"})
+    first.get_or_load(2, "detail", lambda: {"name": "other"})
+
+    second.invalidate(1)
+
+    assert first.get_or_load(1, "detail", lambda: {"name": "new"}) == {"name": "new"}
+    assert second.get_or_load(1, "detail", lambda: pytest.fail("should be a hit")) == {"name": "new"}
+    # Other groups keep their entries
+    assert first.get_or_load(2, "detail", lambda: pytest.fail("should be a hit")) == {"name": "other"}
+
+
+def test_sub_second_ttls_round_up():
+    client = fakeredis.FakeRedis()
+    cache = ReadThroughCache("test", RedisBackend(client, ttl=0.5))
+    cache.get_or_load(1, "detail", lambda: {"name": "x"})
+    cache.get_or_load(1, "replica", lambda: {"name": "y"}, ttl=0.2)
+    assert [client.ttl(key) for key in sorted(client.keys("test:1:*"))] == [1, 1]
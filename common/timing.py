@@ -0,0 +1,451 @@
+"""Per-request timing: Server-Timing headers, rolling per-route latency
+histograms and sampled profiles of slow requests.
+
+``install(app)`` adds the middleware and ``GET /debug/timings`` (guarded by
+the dependencies passed in); routers get handler/serialization timing with
+``APIRouter(route_class=TimedRoute)``.
+Each response carries ``Server-Timing`` with these phases (milliseconds):
+
+- ``auth``: token verification and password hashing
+- ``db``: time inside cursor execution on any engine, with the query count
+- ``deps``: request parsing and dependency resolution before the handler
+- ``handler``: the endpoint function itself
+- ``serialize``: response model validation and rendering after the handler
+- ``total``: until the response starts
+
+The same middleware feeds the request metrics in ``common.metrics``.
+
+Profiling is off by default and is switched at runtime, without a restart,
+through a JSON control file (``PROFILE_CONTROL_FILE``, default
+``profiling.json`` at the repo root) that every worker of every service
+re-reads when it changes::
+
+    python -m common.timing profile on --sample-rate 0.05 --slow-ms 250
+    python -m common.timing profile off
+
+A sampled request is profiled around its handler; the profile is written
+to ``PROFILE_DIR`` (default ``profiles/`` at the repo root) only if the whole request took at least ``slow_ms``.
+``pyinstrument`` is used when selected and installed, otherwise cProfile.
+"""
+import argparse
+import functools
+import inspect
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from common import metrics
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+PHASES = ("auth", "db", "deps", "handler", "serialize")
+# Services run from their own directories; shared files resolve from here
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_current: ContextVar[Optional["RequestTimings"]] = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    __slots__ = ("phases", "db_queries", "route", "handler_start", "handler_end", "profile")
+
+    def __init__(self):
+        self.phases = {}
+        self.db_queries = 0
+        self.route = None
+        self.handler_start = None
+        self.handler_end = None
+        self.profile = None
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def header(self, total: float) -> str:
+        parts = []
+        for phase in PHASES:
+            if phase in self.phases:
+                part = f"{phase};dur={self.phases[phase] * 1000:.2f}"
+                if phase == "db":
+                    part += f';desc="{self.db_queries} queries"'
+                parts.append(part)
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+def current() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+def record(phase: str, seconds: float):
+    """Add ``seconds`` to ``phase`` of the current request; a no-op outside requests."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+
+@contextmanager
+def timed(phase: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - started)
+
+
+# ---------- Rolling histograms ----------
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class RollingHistograms:
+    """Per-route latency histograms over the last ``window`` seconds.
+
+    The window is split into ``slots`` time slices; old slices are dropped
+    whole, so memory stays at slots x routes x buckets. Only touched from
+    the event loop thread.
+    """
+
+    def __init__(self, window: float = 300.0, slots: int = 10):
+        self.window = window
+        self.slot_seconds = window / slots
+        self._slots = deque(maxlen=slots)
+
+    def _slot(self, now: float) -> dict:
+        slot_start = now - now % self.slot_seconds
+        if not self._slots or self._slots[-1][0] != slot_start:
+            self._slots.append((slot_start, {}))
+        return self._slots[-1][1]
+
+    def observe(self, route: str, ms: float):
+        routes = self._slot(time.monotonic())
+        stats = routes.get(route)
+        if stats is None:
+            stats = routes[route] = {"counts": [0] * (len(BUCKETS_MS) + 1), "sum": 0.0, "max": 0.0}
+        index = next((i for i, bound in enumerate(BUCKETS_MS) if ms <= bound), len(BUCKETS_MS))
+        stats["counts"][index] += 1
+        stats["sum"] += ms
+        stats["max"] = max(stats["max"], ms)
+
+    @staticmethod
+    def _quantile(stats, total, q):
+        # Upper bound of the bucket holding the q-th request; the observed max past the last bound
+        rank = q * total
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, stats["counts"]):
+            seen += count
+            if seen >= rank:
+                return min(bound, round(stats["max"], 2))
+        return round(stats["max"], 2)
+
+    def snapshot(self) -> dict:
+        cutoff = time.monotonic() - self.window
+        merged = {}
+        for slot_start, routes in self._slots:
+            if slot_start + self.slot_seconds < cutoff:
+                continue
+            for route, stats in routes.items():
+                into = merged.setdefault(route, {"counts": [0] * (len(BUCKETS_MS) + 1), "sum": 0.0, "max": 0.0})
+                into["counts"] = [a + b for a, b in zip(into["counts"], stats["counts"])]
+                into["sum"] += stats["sum"]
+                into["max"] = max(into["max"], stats["max"])
+        report = {}
+        for route, stats in sorted(merged.items()):
+            total = sum(stats["counts"])
+            report[route] = {
+                "count": total,
+                "mean_ms": round(stats["sum"] / total, 2),
+                "max_ms": round(stats["max"], 2),
+                "p50_ms": self._quantile(stats, total, 0.50),
+                "p95_ms": self._quantile(stats, total, 0.95),
+                "p99_ms": self._quantile(stats, total, 0.99),
+                "buckets": dict(zip([str(b) for b in BUCKETS_MS] + ["+Inf"], stats["counts"])),
+            }
+        return report
+
+
+route_histograms = RollingHistograms(window=float(os.getenv("TIMING_WINDOW_SECONDS", "300")))
+
+
+# ---------- Profiling ----------
+class ProfileSettings:
+    """Profiling switches from the environment, overridden by the control file."""
+
+    def __init__(self, control_file: str, check_interval: float = 1.0):
+        self.control_file = control_file
+        self.check_interval = check_interval
+        self.defaults = {
+            "enabled": os.getenv("PROFILE_ENABLED") == "1",
+            "sample_rate": float(os.getenv("PROFILE_SAMPLE_RATE", "0.01")),
+            "slow_ms": float(os.getenv("PROFILE_SLOW_MS", "500")),
+            "engine": os.getenv("PROFILE_ENGINE", "cprofile"),
+            "dir": os.getenv("PROFILE_DIR", os.path.join(REPO_ROOT, "profiles")),
+        }
+        self.settings = dict(self.defaults)
+        self._mtime = None
+        self._checked_at = 0.0
+        # cProfile allows one active profiler per process, so sample one request at a time
+        self._busy = threading.Lock()
+
+    def current(self) -> dict:
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            try:
+                mtime = os.path.getmtime(self.control_file)
+            except OSError:
+                mtime = None
+            if mtime != self._mtime:
+                overrides = {}
+                if mtime is not None:
+                    try:
+                        with open(self.control_file) as f:
+                            overrides = json.load(f)
+                    except (OSError, ValueError):
+                        # Keep the previous settings and retry on the next check
+                        return self.settings
+                self._mtime = mtime
+                self.settings = {**self.defaults, **overrides}
+        return self.settings
+
+    def start(self, is_async: bool):
+        settings = self.current()
+        if not settings["enabled"] or random.random() >= settings["sample_rate"]:
+            return None
+        if not self._busy.acquire(blocking=False):
+            return None
+        try:
+            if settings["engine"] == "pyinstrument" and pyinstrument is not None:
+                profiler = pyinstrument.Profiler(async_mode="enabled" if is_async else "disabled")
+            else:
+                import cProfile
+                profiler = cProfile.Profile()
+            profiler.enable() if hasattr(profiler, "enable") else profiler.start()
+            return profiler
+        except Exception:
+            self._busy.release()
+            raise
+
+    def stop(self, profiler):
+        try:
+            profiler.disable() if hasattr(profiler, "disable") else profiler.stop()
+        finally:
+            self._busy.release()
+
+    def save(self, profiler, method: str, route: str, seconds: float):
+        settings = self.current()
+        if seconds * 1000 < settings["slow_ms"]:
+            return None
+        os.makedirs(settings["dir"], exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        base = os.path.join(settings["dir"], f"{time.strftime('%Y%m%d-%H%M%S')}-{method}-{slug}-{seconds * 1000:.0f}ms")
+        if hasattr(profiler, "dump_stats"):
+            path = base + ".prof"
+            profiler.dump_stats(path)
+        else:
+            path = base + ".html"
+            with open(path, "w") as f:
+                f.write(profiler.output_html())
+        return path
+
+
+profile_settings = ProfileSettings(
+    os.path.abspath(os.getenv("PROFILE_CONTROL_FILE", os.path.join(REPO_ROOT, "profiling.json")))
+)
+
+
+# ---------- Routes ----------
+def _timed_endpoint(endpoint):
+    # include_router re-creates routes from already wrapped endpoints
+    if getattr(endpoint, "__timed__", False):
+        return endpoint
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            timings = _current.get()
+            if timings is None:
+                return await endpoint(*args, **kwargs)
+            profiler = profile_settings.start(is_async=True)
+            timings.handler_start = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                timings.handler_end = time.perf_counter()
+                if profiler is not None:
+                    profile_settings.stop(profiler)
+                    timings.profile = profiler
+    else:
+        # Runs in the threadpool; the copied context still holds the same RequestTimings
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            timings = _current.get()
+            if timings is None:
+                return endpoint(*args, **kwargs)
+            profiler = profile_settings.start(is_async=False)
+            timings.handler_start = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                timings.handler_end = time.perf_counter()
+                if profiler is not None:
+                    profile_settings.stop(profiler)
+                    timings.profile = profiler
+
+    wrapper.__timed__ = True
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """Splits a route's time into deps, handler and serialize."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        route_path = self.path
+
+        async def timed_handler(request):
+            timings = _current.get()
+            if timings is None:
+                return await handler(request)
+            timings.route = route_path
+            started = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                # Also on errors, e.g. a 401 raised by an auth dependency
+                if timings.handler_start is None:
+                    timings.add("deps", time.perf_counter() - started)
+                else:
+                    timings.add("deps", timings.handler_start - started)
+                    timings.add("handler", timings.handler_end - timings.handler_start)
+                    timings.add("serialize", time.perf_counter() - timings.handler_end)
+
+        return timed_handler
+
+
+# ---------- Middleware ----------
+class TimingMiddleware:
+    def __init__(self, app, histograms: RollingHistograms = route_histograms, profiles: ProfileSettings = profile_settings):
+        self.app = app
+        self.histograms = histograms
+        self.profiles = profiles
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        status = 500
+        metrics.IN_FLIGHT.inc()
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                header = timings.header(time.perf_counter() - started).encode()
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            metrics.IN_FLIGHT.dec()
+            elapsed = time.perf_counter() - started
+            method, route = scope["method"], timings.route or "unmatched"
+            self.histograms.observe(f"{method} {route}", elapsed * 1000)
+            metrics.observe_request(method, route, status, elapsed, timings.db_queries)
+            if timings.profile is not None:
+                self.profiles.save(timings.profile, method, route, elapsed)
+
+
+# ---------- SQL ----------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current.get()
+    if context is not None and timings is not None:
+        timings.db_queries += 1
+        context._timing_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_timing_started", None)
+    timings = _current.get()
+    if started is None or timings is None:
+        return
+    timings.add("db", time.perf_counter() - started)
+
+
+def instrument_engines():
+    """Time cursor execution on every engine in the process (primary, replicas, async)."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def install(app: FastAPI, dependencies=()):
+    """Call right after creating the app, after any other middleware is added.
+
+    ``dependencies`` guard ``/debug/timings`` (e.g. ``[Depends(require_ops_access)]``).
+    """
+    instrument_engines()
+    # Routes declared on the app itself (e.g. /ping) are timed too
+    app.router.route_class = TimedRoute
+    app.add_middleware(TimingMiddleware)
+
+    # async: the histograms are only safe to read on the event loop that updates them
+    @app.get("/debug/timings", include_in_schema=False, dependencies=list(dependencies))
+    async def debug_timings():
+        return {
+            "window_seconds": route_histograms.window,
+            "routes": route_histograms.snapshot(),
+            "profiling": profile_settings.current(),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m common.timing", description="Toggle request profiling at runtime")
+    sub = parser.add_subparsers(dest="command", required=True)
+    profile = sub.add_parser("profile", help="write the profiling control file")
+    profile.add_argument("state", choices=("on", "off"))
+    profile.add_argument("--sample-rate", type=float)
+    profile.add_argument("--slow-ms", type=float)
+    profile.add_argument("--engine", choices=("cprofile", "pyinstrument"))
+    profile.add_argument("--dir")
+    args = parser.parse_args()
+
+    path = profile_settings.control_file
+    settings = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            settings = json.load(f)
+    settings["enabled"] = args.state == "on"
+    for key in ("sample_rate", "slow_ms", "engine", "dir"):
+        if getattr(args, key) is not None:
+            settings[key] = getattr(args, key)
+    # Replace atomically, so a worker never reads a half-written file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(settings, f, indent=2)
+    os.replace(tmp_path, path)
+    print(f"{path}: {settings}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+# Query budget marker and fixtures (see common.querycount)
+pytest_plugins = ["common.querycount"]
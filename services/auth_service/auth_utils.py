@@ -21,30 +21,17 @@ def require_superadmin(token: str = Depends(oauth2_scheme), db: Session = Depend
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
-from passlib.context import CryptContext
-from jose import jwt
-from datetime import datetime, timedelta
-import os
+from common.auth_utils import (
+    create_access_token, decode_token, get_revocation_list, issue_tokens, logout, refresh_tokens,
+)
+from common.passwords import PasswordHasherPool, hash_password, verify_password as _verify_password
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-SECRET_KEY = os.getenv("JWT_SECRET", "secret")
-ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+# Login/register handlers hash through this pool; the sync helpers below are for scripts
+password_pool = PasswordHasherPool.from_env()
 
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return hash_password(password)
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def create_access_token(data: dict, expires_delta: int = 60*24):
-    to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=expires_delta)
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-
-def decode_token(token: str):
-    try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-    except Exception:
-        return None
+    return _verify_password(plain_password, hashed_password)
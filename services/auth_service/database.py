@@ -1,10 +1,16 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
+import sys
 from dotenv import load_dotenv
 
+# Make the repo-level ``common`` package importable for entry points that do
+# not go through main.py (alembic, scripts)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from common.db import database_url, make_engine
+
 load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./auth.db")
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+DATABASE_URL = database_url("sqlite:///./auth.db")
+engine = make_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
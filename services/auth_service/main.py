@@ -1,7 +1,16 @@
-from fastapi import FastAPI
+import os
+import sys
+
+# Make the repo-level ``common`` package importable when run from this directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from fastapi import Depends, FastAPI
 from routers import auth
 from database import Base, engine
+import auth_utils
 from fastapi.middleware.cors import CORSMiddleware
+from common import metrics, timing
+from common.auth_utils import require_ops_access
 
 app = FastAPI(title="Auth Service")
 
@@ -12,13 +21,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+# /metrics and /debug/timings need OPS_TOKEN or a superadmin token
+OPS_ONLY = [Depends(require_ops_access)]
+# Outermost, so Server-Timing covers the other middleware too
+timing.install(app, dependencies=OPS_ONLY)
+metrics.install(app, {"primary": engine}, dependencies=OPS_ONLY)
 
 # Create tables
 Base.metadata.create_all(bind=engine)
 
 app.include_router(auth.router, prefix="/auth")
 
+@app.on_event("startup")
+def on_startup():
+    # Load persisted revocations before the first request is verified
+    auth_utils.get_revocation_list()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    auth_utils.password_pool.shutdown()
+
 
 @app.get("/ping")
 def ping():
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import models, schemas, auth_utils, database
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from common.db import commit_returning
+from common.timing import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 def get_db():
@@ -14,91 +18,100 @@ def get_db():
         db.close()
 
 
-# User registration and login
-@router.post("/user/register", response_model=schemas.UserOut)
-def user_register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+# ---------- Helpers ----------
+# Handlers are async so bcrypt can be awaited on the process pool; the sync
+# session work is pushed to the threadpool instead of running on the loop.
+def _find_user(db: Session, email: str, role: str = None):
+    query = db.query(models.User).filter(models.User.email == email)
+    if role is not None:
+        query = query.filter(models.User.role == role)
+    return query.first()
+
+def _save_user(db: Session, user):
+    return commit_returning(db, user)
+
+async def _register(user: schemas.UserCreate, db: Session, role: str):
+    db_user = await run_in_threadpool(_find_user, db, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_pw = auth_utils.get_password_hash(user.password)
+    hashed_pw = await auth_utils.password_pool.hash(user.password)
     new_user = models.User(
         name=user.name,
         email=user.email,
         password_hash=hashed_pw,
-        role="user"
+        role=role
     )
-    db.add(new_user)
+    return await run_in_threadpool(_save_user, db, new_user)
+
+def _rehash_user(db: Session, user, new_hash: str):
+    user.password_hash = new_hash
     db.commit()
-    db.refresh(new_user)
-    return new_user
 
-@router.post("/user/login", response_model=schemas.Token)
-def user_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == form_data.username, models.User.role == "user").first()
-    if not user or not auth_utils.verify_password(form_data.password, user.password_hash):
+async def _login(form_data: OAuth2PasswordRequestForm, db: Session, role: str = None):
+    user = await run_in_threadpool(_find_user, db, form_data.username, role)
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await auth_utils.password_pool.verify_and_update(form_data.password, user.password_hash)
+    if not valid:
         raise HTTPException(status_code=401, detail="Incorrect email or password")
-    access_token = auth_utils.create_access_token({"user_id": user.id, "role": user.role})
-    return {"access_token": access_token, "token_type": "bearer"}
+    # Read claims before a rehash commit expires the instance
+    claims = {"user_id": user.id, "role": user.role}
+    if new_hash:
+        # Stored hash predates the current policy; migrate it transparently
+        await run_in_threadpool(_rehash_user, db, user, new_hash)
+    return auth_utils.issue_tokens(claims)
+
+def _claims_for(db: Session, user_id: int):
+    # Re-read on refresh so role changes and deletions apply within one access TTL
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    if not user:
+        return None
+    return {"user_id": user.id, "role": user.role}
+
+
+# User registration and login
+@router.post("/user/register", response_model=schemas.UserOut)
+async def user_register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    return await _register(user, db, "user")
+
+@router.post("/user/login", response_model=schemas.Token)
+async def user_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    return await _login(form_data, db, "user")
 
 # Restaurant admin registration and login
 @router.post("/restaurant/register", response_model=schemas.UserOut)
-def restaurant_register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
-    if db_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_pw = auth_utils.get_password_hash(user.password)
-    new_user = models.User(
-        name=user.name,
-        email=user.email,
-        password_hash=hashed_pw,
-        role="restaurantadmin"
-    )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return new_user
+async def restaurant_register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    return await _register(user, db, "restaurantadmin")
 
 @router.post("/restaurant/login", response_model=schemas.Token)
-def restaurant_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == form_data.username, models.User.role == "restaurantadmin").first()
-    if not user or not auth_utils.verify_password(form_data.password, user.password_hash):
-        raise HTTPException(status_code=401, detail="Incorrect email or password")
-    access_token = auth_utils.create_access_token({"user_id": user.id, "role": user.role})
-    return {"access_token": access_token, "token_type": "bearer"}
+async def restaurant_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    return await _login(form_data, db, "restaurantadmin")
 
 # Superadmin registration and login (should be protected in production)
 @router.post("/superadmin/register", response_model=schemas.UserOut)
-def superadmin_register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
-    if db_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_pw = auth_utils.get_password_hash(user.password)
-    new_user = models.User(
-        name=user.name,
-        email=user.email,
-        password_hash=hashed_pw,
-        role="superadmin"
-    )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return new_user
+async def superadmin_register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    return await _register(user, db, "superadmin")
 
 @router.post("/superadmin/login", response_model=schemas.Token)
-def superadmin_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == form_data.username, models.User.role == "superadmin").first()
-    if not user or not auth_utils.verify_password(form_data.password, user.password_hash):
-        raise HTTPException(status_code=401, detail="Incorrect email or password")
-    access_token = auth_utils.create_access_token({"user_id": user.id, "role": user.role})
-    return {"access_token": access_token, "token_type": "bearer"}
+async def superadmin_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    return await _login(form_data, db, "superadmin")
 
 @router.post("/login", response_model=schemas.Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not auth_utils.verify_password(form_data.password, user.password_hash):
-        raise HTTPException(status_code=401, detail="Incorrect email or password")
-    access_token = auth_utils.create_access_token({"user_id": user.id, "role": user.role})
-    return {"access_token": access_token, "token_type": "bearer"}
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    return await _login(form_data, db)
+
+# Token refresh and logout
+@router.post("/refresh", response_model=schemas.Token)
+def refresh(body: schemas.TokenRefresh, db: Session = Depends(get_db)):
+    return auth_utils.refresh_tokens(body.refresh_token, lambda user_id: _claims_for(db, user_id))
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(body: Optional[schemas.TokenRefresh] = None, token: str = Depends(oauth2_scheme)):
+    payload = auth_utils.decode_token(token)
+    if not payload:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    auth_utils.logout(payload, body.refresh_token if body else None)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 @router.get("/me", response_model=schemas.UserOut)
 def get_me(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
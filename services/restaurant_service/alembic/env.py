@@ -5,6 +5,10 @@ from sqlalchemy import pool
 
 from alembic import context
 
+# Run from services/restaurant_service (prepend_sys_path = .)
+import database
+import models
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -14,11 +18,14 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# Migrate the same database the service uses (DATABASE_URL / .env)
+config.set_main_option("sqlalchemy.url", database.DATABASE_URL.replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-target_metadata = None
+target_metadata = models.Base.metadata
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -1,31 +1,20 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
-import os
 from dotenv import load_dotenv
-from sqlalchemy.orm import Session
 
-from database import get_db  # ✅ Now works
+from common.auth_utils import decode_token
 
-# Load environment variables
+# Load environment variables (JWT_* settings are read by common.auth_utils)
 load_dotenv()
 
-SECRET_KEY = os.getenv("JWT_SECRET", "secret")
-ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
-
 security = HTTPBearer()
 
 def verify_token(token: str):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
-        return None
+    return decode_token(token)
 
-# Dependency to get current user
+# Dependency to get current user (claims only; no database access)
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
 ):
     token = credentials.credentials
     payload = verify_token(token)
@@ -36,12 +25,9 @@ async def get_current_user(
             detail="Invalid or expired token"
         )
 
-    # ⚠️ Replace with your actual User model and service
-    # Example: user = db.query(User).filter(User.id == payload.get("id")).first()
     user = {"user_id": payload.get("user_id"), "role": payload.get("role")}
 
-
-    if user is ["user_id"] is None:
+    if user["user_id"] is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
@@ -0,0 +1,151 @@
+"""Content-addressed storage for uploaded images.
+
+Blobs live at ``UPLOAD_DIR/blobs/ab/cd/<sha256><ext>``: identical uploads
+share one file and a path never changes content, so it can be cached
+forever. References are the ``license_image``/``restaurant_image``/
+``MenuItem.image`` columns themselves; ``collect_garbage`` counts them and
+removes blobs nothing points at any more.
+
+Run ``python blobstore.py gc`` from this directory to sweep orphans.
+"""
+import os
+import re
+import time
+from collections import Counter
+
+from sqlalchemy import func, select, union_all
+from sqlalchemy.orm import Session
+
+import models
+
+# Where we store uploaded images
+UPLOAD_DIR = "uploaded_files"
+BLOB_DIR = os.path.join(UPLOAD_DIR, "blobs")
+# Orphans younger than this may belong to an upload whose row is not committed yet
+GC_GRACE_SECONDS = int(os.getenv("BLOB_GC_GRACE_SECONDS", "3600"))
+
+# URL prefix under which UPLOAD_DIR is exposed to clients
+FILES_URL = "/files"
+
+_SAFE_EXT = re.compile(r"^\.[a-z0-9]{1,8}$")
+
+
+def blob_path(digest: str, filename: str = None) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    if not _SAFE_EXT.match(ext):
+        ext = ""
+    return os.path.join(BLOB_DIR, digest[:2], digest[2:4], digest + ext)
+
+
+def is_blob(path: str) -> bool:
+    return bool(path) and os.path.normpath(path).startswith(BLOB_DIR + os.sep)
+
+
+def public_url(path: str) -> str:
+    return FILES_URL + "/" + os.path.relpath(path, UPLOAD_DIR).replace(os.sep, "/")
+
+
+def file_url(path: str) -> str:
+    """Client-facing form of a stored image: files under UPLOAD_DIR become
+    their public URL, anything else (external URLs) is returned unchanged."""
+    if path and os.path.normpath(path).startswith(UPLOAD_DIR + os.sep):
+        return public_url(path)
+    return path
+
+
+def local_path(path: str) -> str:
+    """Inverse of ``file_url``, for clients that send a public URL back."""
+    if path and path.startswith(FILES_URL + "/"):
+        return os.path.join(UPLOAD_DIR, *path[len(FILES_URL) + 1:].split("/"))
+    return path
+
+
+def put(tmp_path: str, digest: str, filename: str = None) -> str:
+    """Move a fully written temp file into the store; duplicates are dropped."""
+    path = blob_path(digest, filename)
+    if os.path.exists(path):
+        try:
+            # Refresh mtime so a concurrent GC treats the blob as freshly referenced
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # GC removed it after the exists() check; store our copy instead
+        else:
+            os.unlink(tmp_path)
+            return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(tmp_path, path)
+    return path
+
+
+def reference_counts(db: Session) -> Counter:
+    columns = (
+        models.Restaurant.license_image,
+        models.Restaurant.restaurant_image,
+        models.MenuItem.image,
+    )
+    refs = union_all(
+        *(select(col.label("path")).where(col.isnot(None)) for col in columns)
+    ).subquery()
+    rows = db.execute(select(refs.c.path, func.count()).group_by(refs.c.path))
+    counts = Counter()
+    for path, count in rows:
+        counts[os.path.normpath(local_path(path))] += count
+    return counts
+
+
+def collect_garbage(db: Session, grace_seconds: int = GC_GRACE_SECONDS) -> dict:
+    """Delete unreferenced blobs, variants whose blob is gone and stale temp files."""
+    refs = reference_counts(db)
+    cutoff = time.time() - grace_seconds
+    victims = []
+
+    for root, _dirs, files in os.walk(BLOB_DIR):
+        kept = set()
+        for name in files:
+            path = os.path.join(root, name)
+            if name.endswith(".tmp"):
+                # Left behind by a crashed or cancelled variant job
+                if os.path.getmtime(path) <= cutoff:
+                    victims.append(path)
+                continue
+            digest = name.split(".", 1)[0]
+            if "_" in digest:
+                # Derived file (e.g. a resized variant); follows its original below
+                continue
+            if refs.get(os.path.normpath(path)) or os.path.getmtime(path) > cutoff:
+                kept.add(digest)
+            else:
+                victims.append(path)
+        for name in files:
+            digest = name.split(".", 1)[0]
+            if not name.endswith(".tmp") and "_" in digest and digest.split("_", 1)[0] not in kept:
+                victims.append(os.path.join(root, name))
+
+    for name in os.listdir(UPLOAD_DIR):
+        path = os.path.join(UPLOAD_DIR, name)
+        if name.startswith(".upload-") and os.path.getmtime(path) <= cutoff:
+            victims.append(path)
+
+    removed, freed = 0, 0
+    for path in victims:
+        try:
+            size = os.path.getsize(path)
+            os.unlink(path)
+        except FileNotFoundError:
+            continue
+        freed += size
+        removed += 1
+    return {"referenced": len(refs), "removed_files": removed, "freed_bytes": freed}
+
+
+if __name__ == "__main__":
+    import sys
+    from database import SessionLocal
+
+    if sys.argv[1:] != ["gc"]:
+        sys.exit("usage: python blobstore.py gc")
+    db = SessionLocal()
+    try:
+        print(collect_garbage(db))
+    finally:
+        db.close()
@@ -0,0 +1,151 @@
+import csv
+import io
+import json
+import os
+
+from fastapi import HTTPException, UploadFile
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+import models, schemas
+from database import SessionLocal
+
+FORMATS = ("csv", "jsonl")
+EXPORT_FIELDS = ("name", "description", "price", "image")
+BATCH_SIZE = 500
+MAX_BULK_ITEMS = int(os.getenv("MAX_BULK_MENU_ITEMS", "5000"))
+MAX_REPORTED_ERRORS = 50
+READ_SIZE = 64 * 1024
+
+
+def detect_format(upload: UploadFile, fmt: str = None) -> str:
+    if fmt is None:
+        name = (upload.filename or "").lower()
+        fmt = "csv" if name.endswith(".csv") else "jsonl"
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format, expected one of {FORMATS}")
+    return fmt
+
+
+def _lines(file):
+    """Decoded lines, split on "\n" only.
+
+    A text reader would use str.splitlines rules and also split on U+2028,
+    U+2029 and U+0085, which JSON allows unescaped inside strings.
+    """
+    file.seek(0)
+    encoding = "utf-8-sig"  # Drop a BOM on the first line only
+    pending = b""
+    while True:
+        chunk = file.read(READ_SIZE)
+        if not chunk:
+            break
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            yield (line + b"\n").decode(encoding)
+            encoding = "utf-8"
+    if pending:
+        yield pending.decode(encoding)
+
+
+def _records(upload: UploadFile, fmt: str):
+    """Yield (line number, parsed record) pairs without reading the whole file into memory.
+
+    An unparsable JSON line yields its ValueError in place of the record.
+    """
+    lines = _lines(upload.file)
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for record in reader:
+            # Empty CSV cells mean "not provided", not empty strings
+            yield reader.line_num, {k: v for k, v in record.items() if k and v != ""}
+        return
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as exc:
+            yield line_no, exc
+
+
+def import_menu(db: Session, restaurant_id: int, upload: UploadFile, fmt: str) -> int:
+    """Validate and insert every record in one transaction; nothing is written if any record fails."""
+    errors = []
+    batch = []
+    inserted = 0
+    records = _records(upload, fmt)
+    while True:
+        try:
+            line_no, record = next(records)
+        except StopIteration:
+            break
+        except (ValueError, csv.Error) as exc:
+            # Malformed CSV or bad encoding; the stream cannot be resumed
+            errors.append({"line": None, "error": str(exc)})
+            break
+        if inserted + len(batch) >= MAX_BULK_ITEMS:
+            errors.append({"line": line_no, "error": f"More than {MAX_BULK_ITEMS} items"})
+            break
+        if isinstance(record, ValueError):
+            errors.append({"line": line_no, "error": f"Invalid JSON: {record}"})
+        else:
+            try:
+                item = schemas.MenuItemCreate.model_validate(record)
+            except ValidationError as exc:
+                errors.append({
+                    "line": line_no,
+                    "error": [{"loc": e["loc"], "msg": e["msg"]} for e in exc.errors()],
+                })
+            else:
+                # After the first error keep validating for the report, but stop inserting
+                if not errors:
+                    batch.append({**item.model_dump(), "restaurant_id": restaurant_id})
+        if len(errors) >= MAX_REPORTED_ERRORS:
+            break
+        if len(batch) >= BATCH_SIZE:
+            db.execute(insert(models.MenuItem), batch)
+            inserted += len(batch)
+            batch = []
+
+    if errors:
+        db.rollback()
+        raise HTTPException(status_code=422, detail=errors)
+    if batch:
+        db.execute(insert(models.MenuItem), batch)
+        inserted += len(batch)
+    db.commit()
+    return inserted
+
+
+def export_menu(restaurant_id: int, fmt: str):
+    """Stream a restaurant's menu as CSV or JSON Lines.
+
+    Uses its own session because the response body is produced after the
+    request's session dependency may already have been closed.
+    """
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(*(getattr(models.MenuItem, f) for f in EXPORT_FIELDS))
+            .where(models.MenuItem.restaurant_id == restaurant_id)
+            .order_by(models.MenuItem.id)
+            .execution_options(yield_per=BATCH_SIZE)
+        )
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_FIELDS)
+            for row in rows:
+                writer.writerow(row)
+                if buffer.tell() > 64 * 1024:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+        else:
+            for row in rows:
+                yield json.dumps(dict(row._mapping)) + "\n"
+    finally:
+        db.close()
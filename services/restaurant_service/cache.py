@@ -0,0 +1,6 @@
+from common.cache import cache_from_env
+
+# Restaurant detail and menu reads, grouped by restaurant id.
+# Writers call restaurant_cache.invalidate(restaurant_id).
+# Namespaced per service, since services may share one CACHE_URL
+restaurant_cache = cache_from_env("restaurant-service")
@@ -1,15 +1,27 @@
-from sqlalchemy import create_engine
+import os
+import sys
+
+from dotenv import load_dotenv
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-# Use SQLite database (stored locally as restaurant.db)
-DATABASE_URL = "sqlite:///./restaurant.db"
+# Make the repo-level ``common`` package importable for entry points that do
+# not go through main.py (blobstore.py gc, alembic)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
-# For SQLite need check_same_thread=False for multithreading in FastAPI
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
+from common.db import (
+    ReadRouter, database_url, engine_options, install_sqlite_pragmas, is_sqlite, make_engine,
 )
 
+load_dotenv()
+
+# Defaults to a local SQLite file; any SQLAlchemy URL (e.g. postgresql://) works
+DATABASE_URL = database_url("sqlite:///./restaurant.db")
+
+engine = make_engine(DATABASE_URL)
+
 # Create a session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -23,3 +35,67 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Read-only endpoints use replicas from DATABASE_REPLICA_URLS when configured
+read_router = ReadRouter.from_env(SessionLocal)
+
+def get_read_db(request: Request):
+    db = read_router.session(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# ---------- Async (opt-in with ASYNC_DB=1) ----------
+# The sync engine above stays for create_all, uploads, bulk import/export and CLIs.
+ASYNC_DB = os.getenv("ASYNC_DB") == "1"
+
+# Async drivers per dialect: aiosqlite locally, asyncpg for Postgres
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+")[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {scheme!r}")
+    return ASYNC_DRIVERS[dialect] + sep + rest
+
+
+async_engine = None
+AsyncSessionLocal = None
+async_read_router = None
+if ASYNC_DB:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    def _async_sessionmaker(url: str, **kwargs):
+        url = async_url(url)
+        engine = create_async_engine(url, **engine_options(url))
+        if is_sqlite(url):
+            install_sqlite_pragmas(engine)
+        # expire_on_commit=False: responses are serialized after commit, and an
+        # expired attribute would need an implicit (unsupported) async lazy load
+        return async_sessionmaker(engine, autoflush=False, expire_on_commit=False, **kwargs)
+
+    AsyncSessionLocal = _async_sessionmaker(DATABASE_URL)
+    async_engine = AsyncSessionLocal.kw["bind"]
+    # Same replicas, stickiness and cache TTLs as read_router, over async drivers
+    async_read_router = ReadRouter.from_env(
+        AsyncSessionLocal,
+        replica_factory=lambda url: _async_sessionmaker(url, info={"replica": True}),
+        # StickyPrimaryMiddleware pins users through read_router's store
+        sticky_store=read_router.sticky_store,
+    )
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db(request: Request):
+    # The sticky lookup may be a Redis round-trip; keep it off the event loop
+    sticky = await run_in_threadpool(async_read_router.is_sticky, request) if async_read_router.replicas else False
+    async with async_read_router.session(request, sticky=sticky) as db:
+        yield db
@@ -0,0 +1,39 @@
+"""Check that hot filter paths use an index.
+
+Run from services/restaurant_service after migrating::
+
+    alembic upgrade head && python explain_check.py
+    python explain_check.py --scratch    # schema from models, in-memory SQLite
+"""
+from sqlalchemy import select
+
+import database
+import models
+from common.explain import main
+
+HOT_QUERIES = [
+    (
+        "menu items of a restaurant",
+        select(models.MenuItem).where(models.MenuItem.restaurant_id == 1).order_by(models.MenuItem.id),
+        "ix_menu_items_restaurant_id",
+    ),
+    (
+        "timings of a restaurant",
+        select(models.RestaurantTiming).where(models.RestaurantTiming.restaurant_id == 1),
+        "ix_restaurant_timings_restaurant_id",
+    ),
+    (
+        "restaurants of an owner",
+        select(models.Restaurant).where(models.Restaurant.owner_id == 1),
+        "ix_restaurants_owner_id",
+    ),
+    (
+        "pending approval queue",
+        select(models.Restaurant).where(models.PENDING_APPROVAL),
+        "ix_restaurants_pending",
+    ),
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(database.engine, models.Base.metadata, HOT_QUERIES))
@@ -1,6 +1,19 @@
-from fastapi import FastAPI
+import os
+import sys
+
+# Make the repo-level ``common`` package importable when run from this directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from fastapi import Depends, FastAPI
 from routers import restaurant
-import models, database
+from cache import restaurant_cache
+from files import UploadFiles
+from blobstore import FILES_URL, UPLOAD_DIR
+import models, database, variants
+from common.auth_utils import get_revocation_list
+from common.db import StickyPrimaryMiddleware
+from common import metrics, timing
+from common.auth_utils import require_ops_access
 
 app = FastAPI(
     title="Restaurant Service",
@@ -8,12 +21,42 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Reads after this client's own write go to the primary (see common.db.ReadRouter)
+app.add_middleware(StickyPrimaryMiddleware, read_router=database.read_router)
+# /metrics, /debug/timings and /cache/stats need OPS_TOKEN or a superadmin token
+OPS_ONLY = [Depends(require_ops_access)]
+# Outermost, so Server-Timing covers the other middleware too
+timing.install(app, dependencies=OPS_ONLY)
+
+engines = database.read_router.engines()
+if database.async_read_router is not None:
+    engines.update((f"async-{name}", engine) for name, engine in database.async_read_router.engines().items())
+metrics.install(app, engines, dependencies=OPS_ONLY)
+
 @app.on_event("startup")
 def on_startup():
     database.Base.metadata.create_all(bind=database.engine)
+    get_revocation_list()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    variants.shutdown()
+    if database.async_read_router is not None:
+        for engine in database.async_read_router.engines().values():
+            await engine.dispose()
 
+if database.ASYNC_DB:
+    # Imported only here, so the sync default does not need the asyncio extras (greenlet)
+    from routers import restaurant_async
+    # Matched first; routes it does not define fall through to the sync router
+    app.include_router(restaurant_async.router, prefix="/restaurant", tags=["Restaurant"])
 app.include_router(restaurant.router, prefix="/restaurant", tags=["Restaurant"])
+app.mount(FILES_URL, UploadFiles(directory=UPLOAD_DIR, check_dir=False), name="files")
 
 @app.get("/ping")
 def ping():
     return {"message": "Restaurant Service is running"}
+
+@app.get("/cache/stats", dependencies=OPS_ONLY)
+def cache_stats():
+    return restaurant_cache.stats()
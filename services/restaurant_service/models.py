@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, Index, literal_column, text
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -8,7 +8,7 @@ class Restaurant(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
     address = Column(String)
-    owner_id = Column(Integer)
+    owner_id = Column(Integer, index=True)
     license_number = Column(String, nullable=True)
     license_image = Column(String, nullable=True)  # path or URL
     restaurant_image = Column(String, nullable=True)  # path or URL
@@ -16,6 +16,19 @@ class Restaurant(Base):
     menu_items = relationship("MenuItem", back_populates="restaurant")
     timings = relationship("RestaurantTiming", back_populates="restaurant")
 
+    __table_args__ = (
+        # Only the approval queue filters on ``approved``, so index just that slice
+        Index(
+            "ix_restaurants_pending", "id",
+            sqlite_where=text("approved = 'pending'"),
+            postgresql_where=text("approved = 'pending'"),
+        ),
+    )
+
+
+# Inlined rather than bound, so the planner can match ix_restaurants_pending
+PENDING_APPROVAL = Restaurant.approved == literal_column("'pending'")
+
 
 class MenuItem(Base):
     __tablename__ = "menu_items"
@@ -24,14 +37,14 @@ class MenuItem(Base):
     description = Column(String)
     price = Column(Float)
     image = Column(String, nullable=True)  # path or URL
-    restaurant_id = Column(Integer, ForeignKey("restaurants.id"))
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), index=True)
     restaurant = relationship("Restaurant", back_populates="menu_items")
 
 
 class RestaurantTiming(Base):
     __tablename__ = "restaurant_timings"
     id = Column(Integer, primary_key=True, index=True)
-    restaurant_id = Column(Integer, ForeignKey("restaurants.id"))
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), index=True)
     day_of_week = Column(String)  # e.g., 'Monday'
     open_time = Column(String)    # e.g., '09:00'
     close_time = Column(String)   # e.g., '22:00'
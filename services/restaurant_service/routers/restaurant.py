@@ -1,20 +1,36 @@
 # routers/restaurant.py
 from fastapi import (
-    APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+    APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Response, status
 )
-from sqlalchemy.orm import Session
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import delete, exists, select, update
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
-import os
 
 import models, schemas
-from database import get_db
+from database import get_db, get_read_db, read_router
+from cache import restaurant_cache
+from uploads import UploadRoute, save_upload
+import bulk_menu
+import variants
 from auth_utils import get_current_user  # must return payload with "user_id" and "role"
+from common.db import commit_returning
 
-router = APIRouter()
+router = APIRouter(route_class=UploadRoute)
 
-# Where we store uploaded images
-UPLOAD_DIR = "uploaded_files"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+# Page size limits for cursor-paginated listings
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Columns selected for ``view=summary`` listings, matching schemas.RestaurantSummary
+SUMMARY_COLUMNS = (
+    models.Restaurant.id,
+    models.Restaurant.name,
+    models.Restaurant.address,
+    models.Restaurant.restaurant_image,
+    models.Restaurant.approved,
+)
 
 
 # ---------- Helpers ----------
@@ -23,6 +39,46 @@ def _ensure_owner_or_403(restaurant, user_payload):
         raise HTTPException(status_code=403, detail="Not authorized")
 
 
+def _menu_item_match(restaurant_id: int, item_id: int):
+    return (models.MenuItem.restaurant_id == restaurant_id, models.MenuItem.id == item_id)
+
+
+def _owned_menu_item(restaurant_id: int, item_id: int, user_payload):
+    # Ownership rides along in the write's WHERE, so a menu write is one statement
+    return _menu_item_match(restaurant_id, item_id) + (
+        exists().where(
+            models.Restaurant.id == restaurant_id,
+            models.Restaurant.owner_id == user_payload["user_id"],
+        ),
+    )
+
+
+def _menu_item_exists(restaurant_id: int, item_id: int):
+    return select(exists().where(*_menu_item_match(restaurant_id, item_id)))
+
+
+def _menu_write_refused(item_exists: bool):
+    # Only reached when the guarded write matched nothing
+    if not item_exists:
+        raise HTTPException(status_code=404, detail="Menu item not found")
+    raise HTTPException(status_code=403, detail="Not authorized")
+
+
+def _next_page(rows, limit):
+    # Rows were fetched with limit + 1 to know whether another page exists
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = str(rows[-1].id)
+    return rows, headers
+
+
+def _summary_response(rows, headers=None):
+    # Returned directly, so column-only rows skip response_model validation
+    summaries = [schemas.RestaurantSummary.model_validate(row) for row in rows]
+    return JSONResponse(content=jsonable_encoder(summaries), headers=headers)
+
+
 # ---------- Restaurant ----------
 @router.post("/", response_model=schemas.RestaurantOut, status_code=status.HTTP_201_CREATED)
 def create_restaurant(
@@ -47,27 +103,55 @@ def create_restaurant(
         license_image=restaurant.license_image,
         restaurant_image=restaurant.restaurant_image,
     )
-    db.add(db_restaurant)
-    db.commit()
-    db.refresh(db_restaurant)
-    return db_restaurant
+    return commit_returning(db, db_restaurant)
 
 
-@router.get("/", response_model=List[schemas.RestaurantOut])
-def list_restaurants(db: Session = Depends(get_db)):
-    return db.query(models.Restaurant).all()
+@router.get("/", response_model=schemas.RestaurantListing)
+def list_restaurants(
+    response: Response,
+    after: Optional[int] = Query(None, description="Cursor: return restaurants with id greater than this"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    view: str = Query("full", pattern="^(full|summary)$"),
+    db: Session = Depends(get_read_db),
+):
+    # Keyset pagination on the primary key; menus and timings for the whole
+    # page are fetched with one batched IN query each instead of per row.
+    if view == "summary":
+        query = db.query(*SUMMARY_COLUMNS)
+    else:
+        query = db.query(models.Restaurant).options(
+            selectinload(models.Restaurant.menu_items),
+            selectinload(models.Restaurant.timings),
+        )
+    query = query.order_by(models.Restaurant.id)
+    if after is not None:
+        query = query.filter(models.Restaurant.id > after)
+
+    restaurants, headers = _next_page(query.limit(limit + 1).all(), limit)
+
+    if view == "summary":
+        return _summary_response(restaurants, headers=headers)
+    response.headers.update(headers)
+    return restaurants
 
 
 @router.get("/{restaurant_id}", response_model=schemas.RestaurantOut)
-def get_restaurant(restaurant_id: int, db: Session = Depends(get_db)):
-    restaurant = (
-        db.query(models.Restaurant)
-        .filter(models.Restaurant.id == restaurant_id)
-        .first()
-    )
-    if not restaurant:
-        raise HTTPException(status_code=404, detail="Restaurant not found")
-    return restaurant
+def get_restaurant(restaurant_id: int, db: Session = Depends(get_read_db)):
+    def load():
+        restaurant = (
+            db.query(models.Restaurant)
+            .options(
+                selectinload(models.Restaurant.menu_items),
+                selectinload(models.Restaurant.timings),
+            )
+            .filter(models.Restaurant.id == restaurant_id)
+            .first()
+        )
+        if not restaurant:
+            raise HTTPException(status_code=404, detail="Restaurant not found")
+        return jsonable_encoder(schemas.RestaurantOut.model_validate(restaurant))
+
+    return restaurant_cache.get_or_load(restaurant_id, "detail", load, **read_router.cache_options(db))
 
 
 # ---------- License & Images ----------
@@ -85,15 +169,10 @@ def update_license(
     restaurant.license_number = license_number
 
     if license_image:
-        file_path = os.path.join(
-            UPLOAD_DIR, f"license_{restaurant_id}_{license_image.filename}"
-        )
-        with open(file_path, "wb") as f:
-            f.write(license_image.file.read())
-        restaurant.license_image = file_path
+        restaurant.license_image = save_upload(license_image).path
 
-    db.commit()
-    db.refresh(restaurant)
+    commit_returning(db, restaurant)
+    restaurant_cache.invalidate(restaurant_id)
     return restaurant
 
 
@@ -107,15 +186,12 @@ def update_restaurant_image(
     restaurant = db.query(models.Restaurant).filter(models.Restaurant.id == restaurant_id).first()
     _ensure_owner_or_403(restaurant, user)
 
-    file_path = os.path.join(
-        UPLOAD_DIR, f"restaurant_{restaurant_id}_{restaurant_image.filename}"
-    )
-    with open(file_path, "wb") as f:
-        f.write(restaurant_image.file.read())
-    restaurant.restaurant_image = file_path
+    image_path = save_upload(restaurant_image).path
+    restaurant.restaurant_image = image_path
 
-    db.commit()
-    db.refresh(restaurant)
+    commit_returning(db, restaurant)
+    restaurant_cache.invalidate(restaurant_id)
+    variants.schedule(image_path, on_rendered=lambda: restaurant_cache.invalidate(restaurant_id))
     return restaurant
 
 
@@ -135,11 +211,7 @@ def create_menu_item(
 
     image_path = None
     if image:
-        image_path = os.path.join(
-            UPLOAD_DIR, f"menu_{restaurant_id}_{image.filename}"
-        )
-        with open(image_path, "wb") as f:
-            f.write(image.file.read())
+        image_path = save_upload(image).path
 
     db_item = models.MenuItem(
         name=name,
@@ -148,36 +220,81 @@ def create_menu_item(
         image=image_path,
         restaurant_id=restaurant_id,
     )
-    db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    commit_returning(db, db_item)
+    restaurant_cache.invalidate(restaurant_id)
+    variants.schedule(image_path, on_rendered=lambda: restaurant_cache.invalidate(restaurant_id))
     return db_item
 
 
 @router.get("/{restaurant_id}/menu", response_model=List[schemas.MenuItemOut])
-def list_menu_items(restaurant_id: int, db: Session = Depends(get_db)):
-    return (
-        db.query(models.MenuItem)
-        .filter(models.MenuItem.restaurant_id == restaurant_id)
-        .all()
+def list_menu_items(restaurant_id: int, db: Session = Depends(get_read_db)):
+    def load():
+        items = (
+            db.query(models.MenuItem)
+            .filter(models.MenuItem.restaurant_id == restaurant_id)
+            .all()
+        )
+        return jsonable_encoder([schemas.MenuItemOut.model_validate(i) for i in items])
+
+    return restaurant_cache.get_or_load(restaurant_id, "menu", load, **read_router.cache_options(db))
+
+
+# ---------- Bulk menu ----------
+@router.post("/{restaurant_id}/menu/bulk", response_model=schemas.BulkImportResult, status_code=status.HTTP_201_CREATED)
+def import_menu_items(
+    restaurant_id: int,
+    file: UploadFile = File(..., description="CSV with a header row, or JSON Lines"),
+    format: Optional[str] = Form(None, description="'csv' or 'jsonl'; inferred from the filename if omitted"),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    restaurant = db.query(models.Restaurant).filter(models.Restaurant.id == restaurant_id).first()
+    _ensure_owner_or_403(restaurant, user)
+
+    inserted = bulk_menu.import_menu(db, restaurant_id, file, bulk_menu.detect_format(file, format))
+    restaurant_cache.invalidate(restaurant_id)
+    return {"inserted": inserted}
+
+
+# Registered before /menu/{item_id} so "export" is not parsed as an item id
+@router.get("/{restaurant_id}/menu/export")
+def export_menu_items(
+    restaurant_id: int,
+    format: str = Query("csv", pattern="^(csv|jsonl)$"),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    restaurant = db.query(models.Restaurant).filter(models.Restaurant.id == restaurant_id).first()
+    _ensure_owner_or_403(restaurant, user)
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        bulk_menu.export_menu(restaurant_id, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="menu_{restaurant_id}.{format}"'},
     )
 
 
 @router.get("/{restaurant_id}/menu/{item_id}", response_model=schemas.MenuItemOut)
 def get_menu_item(
-    restaurant_id: int, item_id: int, db: Session = Depends(get_db)
+    restaurant_id: int, item_id: int, db: Session = Depends(get_read_db)
 ):
-    item = (
-        db.query(models.MenuItem)
-        .filter(
-            models.MenuItem.restaurant_id == restaurant_id,
-            models.MenuItem.id == item_id,
+    def load():
+        item = (
+            db.query(models.MenuItem)
+            .filter(
+                models.MenuItem.restaurant_id == restaurant_id,
+                models.MenuItem.id == item_id,
+            )
+            .first()
         )
-        .first()
+        if not item:
+            raise HTTPException(status_code=404, detail="Menu item not found")
+        return jsonable_encoder(schemas.MenuItemOut.model_validate(item))
+
+    return restaurant_cache.get_or_load(
+        restaurant_id, f"menu:{item_id}", load, **read_router.cache_options(db)
     )
-    if not item:
-        raise HTTPException(status_code=404, detail="Menu item not found")
-    return item
 
 
 @router.put("/{restaurant_id}/menu/{item_id}", response_model=schemas.MenuItemOut)
@@ -188,25 +305,17 @@ def update_menu_item(
     db: Session = Depends(get_db),
     user=Depends(get_current_user),
 ):
-    db_item = (
-        db.query(models.MenuItem)
-        .filter(
-            models.MenuItem.restaurant_id == restaurant_id,
-            models.MenuItem.id == item_id,
-        )
-        .first()
-    )
-    if not db_item:
-        raise HTTPException(status_code=404, detail="Menu item not found")
-
-    restaurant = db.query(models.Restaurant).filter(models.Restaurant.id == restaurant_id).first()
-    _ensure_owner_or_403(restaurant, user)
-
-    for key, value in item.dict().items():
-        setattr(db_item, key, value)
-
-    db.commit()
-    db.refresh(db_item)
+    db_item = db.scalars(
+        update(models.MenuItem)
+        .where(*_owned_menu_item(restaurant_id, item_id, user))
+        .values(**item.dict())
+        .returning(models.MenuItem)
+    ).first()
+    if db_item is None:
+        _menu_write_refused(db.scalar(_menu_item_exists(restaurant_id, item_id)))
+
+    commit_returning(db, db_item)
+    restaurant_cache.invalidate(restaurant_id)
     return db_item
 
 
@@ -217,22 +326,16 @@ def delete_menu_item(
     db: Session = Depends(get_db),
     user=Depends(get_current_user),
 ):
-    db_item = (
-        db.query(models.MenuItem)
-        .filter(
-            models.MenuItem.restaurant_id == restaurant_id,
-            models.MenuItem.id == item_id,
-        )
-        .first()
-    )
-    if not db_item:
-        raise HTTPException(status_code=404, detail="Menu item not found")
-
-    restaurant = db.query(models.Restaurant).filter(models.Restaurant.id == restaurant_id).first()
-    _ensure_owner_or_403(restaurant, user)
+    deleted = db.execute(
+        delete(models.MenuItem)
+        .where(*_owned_menu_item(restaurant_id, item_id, user))
+        .returning(models.MenuItem.id)
+    ).first()
+    if deleted is None:
+        _menu_write_refused(db.scalar(_menu_item_exists(restaurant_id, item_id)))
 
-    db.delete(db_item)
     db.commit()
+    restaurant_cache.invalidate(restaurant_id)
     return None
 
 
@@ -252,30 +355,34 @@ def set_timings(
         models.RestaurantTiming.restaurant_id == restaurant_id
     ).delete()
 
-    # Add new timings
-    for t in timings:
-        db_timing = models.RestaurantTiming(
-            restaurant_id=restaurant_id, **t.dict()
-        )
-        db.add(db_timing)
-
-    db.commit()
-
-    return (
-        db.query(models.RestaurantTiming)
-        .filter(models.RestaurantTiming.restaurant_id == restaurant_id)
-        .all()
-    )
+    # Add new timings; the inserted rows are the response, so no re-select
+    db_timings = [models.RestaurantTiming(restaurant_id=restaurant_id, **t.dict()) for t in timings]
+    commit_returning(db, *db_timings)
+    restaurant_cache.invalidate(restaurant_id)
+    return db_timings
 
 
 # ---------- Superadmin ----------
-@router.get("/admin/restaurants/pending", response_model=List[schemas.RestaurantOut])
+@router.get("/admin/restaurants/pending", response_model=schemas.RestaurantListing)
 def list_pending_restaurants(
-    db: Session = Depends(get_db), user=Depends(get_current_user)
+    view: str = Query("full", pattern="^(full|summary)$"),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
 ):
     if user.get("role") != "superadmin":
         raise HTTPException(status_code=403, detail="Only superadmin can view pending restaurants")
-    return db.query(models.Restaurant).filter(models.Restaurant.approved == "pending").all()
+    if view == "summary":
+        rows = db.query(*SUMMARY_COLUMNS).filter(models.PENDING_APPROVAL).all()
+        return _summary_response(rows)
+    return (
+        db.query(models.Restaurant)
+        .options(
+            selectinload(models.Restaurant.menu_items),
+            selectinload(models.Restaurant.timings),
+        )
+        .filter(models.PENDING_APPROVAL)
+        .all()
+    )
 
 
 @router.post("/admin/restaurants/{restaurant_id}/approve", response_model=schemas.RestaurantOut)
@@ -290,8 +397,8 @@ def approve_restaurant(
         raise HTTPException(status_code=404, detail="Restaurant not found")
 
     restaurant.approved = "approved"
-    db.commit()
-    db.refresh(restaurant)
+    commit_returning(db, restaurant)
+    restaurant_cache.invalidate(restaurant_id)
     return restaurant
 
 
@@ -307,6 +414,6 @@ def reject_restaurant(
         raise HTTPException(status_code=404, detail="Restaurant not found")
 
     restaurant.approved = "rejected"
-    db.commit()
-    db.refresh(restaurant)
+    commit_returning(db, restaurant)
+    restaurant_cache.invalidate(restaurant_id)
     return restaurant
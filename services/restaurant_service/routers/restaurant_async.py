@@ -0,0 +1,209 @@
+# routers/restaurant_async.py
+# Async versions of the restaurant CRUD routes, used when ASYNC_DB=1.
+# main.py includes this router ahead of routers/restaurant.py under the same
+# prefix, so these handlers win for the paths they define; uploads, bulk
+# import/export and superadmin routes are still served by the sync router.
+# Reads go through database.async_read_router, so replicas, sticky-primary
+# routing and replica cache TTLs apply exactly as on the sync side.
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
+
+import models, schemas
+from database import async_read_router, get_async_db, get_async_read_db
+from cache import restaurant_cache
+from auth_utils import get_current_user
+from routers.restaurant import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, SUMMARY_COLUMNS,
+    _ensure_owner_or_403, _menu_item_exists, _menu_write_refused, _next_page, _owned_menu_item,
+    _summary_response,
+)
+from common.db import acommit_returning
+from common.timing import TimedRoute
+
+# Same operations as the sync router, so they are left out of the OpenAPI schema
+router = APIRouter(include_in_schema=False, route_class=TimedRoute)
+
+
+# ---------- Helpers ----------
+async def _get_restaurant(db: AsyncSession, restaurant_id: int):
+    return await db.get(models.Restaurant, restaurant_id)
+
+
+async def _get_menu_item(db: AsyncSession, restaurant_id: int, item_id: int):
+    return await db.scalar(
+        select(models.MenuItem).where(
+            models.MenuItem.restaurant_id == restaurant_id,
+            models.MenuItem.id == item_id,
+        )
+    )
+
+
+def _with_children(stmt):
+    # Async sessions cannot lazy load, so relationships are always eager here
+    return stmt.options(
+        selectinload(models.Restaurant.menu_items),
+        selectinload(models.Restaurant.timings),
+    )
+
+
+# ---------- Restaurant ----------
+@router.post("/", response_model=schemas.RestaurantOut, status_code=status.HTTP_201_CREATED)
+async def create_restaurant(
+    restaurant: schemas.RestaurantCreate,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user),
+):
+    if user.get("role") != "restaurantadmin":
+        raise HTTPException(status_code=403, detail="Only restaurant admins can create restaurants")
+
+    existing = await db.scalar(
+        select(models.Restaurant.id).where(models.Restaurant.name == restaurant.name)
+    )
+    if existing:
+        raise HTTPException(status_code=400, detail="Restaurant with this name already exists")
+
+    db_restaurant = models.Restaurant(
+        name=restaurant.name,
+        address=restaurant.address,
+        owner_id=user["user_id"],
+        license_number=restaurant.license_number,
+        license_image=restaurant.license_image,
+        restaurant_image=restaurant.restaurant_image,
+    )
+    # Also sets the new row's collections empty, which RestaurantOut reads after the session closes
+    return await acommit_returning(db, db_restaurant)
+
+
+@router.get("/", response_model=schemas.RestaurantListing)
+async def list_restaurants(
+    response: Response,
+    after: Optional[int] = Query(None, description="Cursor: return restaurants with id greater than this"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    view: str = Query("full", pattern="^(full|summary)$"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    if view == "summary":
+        stmt = select(*SUMMARY_COLUMNS)
+    else:
+        stmt = _with_children(select(models.Restaurant))
+    stmt = stmt.order_by(models.Restaurant.id)
+    if after is not None:
+        stmt = stmt.where(models.Restaurant.id > after)
+
+    result = await db.execute(stmt.limit(limit + 1))
+    rows = result.all() if view == "summary" else result.scalars().all()
+    restaurants, headers = _next_page(rows, limit)
+
+    if view == "summary":
+        return _summary_response(restaurants, headers=headers)
+    response.headers.update(headers)
+    return restaurants
+
+
+@router.get("/{restaurant_id}", response_model=schemas.RestaurantOut)
+async def get_restaurant(restaurant_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    async def load():
+        restaurant = await db.scalar(
+            _with_children(select(models.Restaurant)).where(models.Restaurant.id == restaurant_id)
+        )
+        if not restaurant:
+            raise HTTPException(status_code=404, detail="Restaurant not found")
+        return jsonable_encoder(schemas.RestaurantOut.model_validate(restaurant))
+
+    return await restaurant_cache.aget_or_load(restaurant_id, "detail", load, **async_read_router.cache_options(db))
+
+
+# ---------- Menu ----------
+@router.get("/{restaurant_id}/menu", response_model=List[schemas.MenuItemOut])
+async def list_menu_items(restaurant_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    async def load():
+        items = await db.scalars(
+            select(models.MenuItem).where(models.MenuItem.restaurant_id == restaurant_id)
+        )
+        return jsonable_encoder([schemas.MenuItemOut.model_validate(i) for i in items])
+
+    return await restaurant_cache.aget_or_load(restaurant_id, "menu", load, **async_read_router.cache_options(db))
+
+
+# ``item_id:int`` on the item routes keeps GET /menu/export from matching here
+# before the sync router
+@router.get("/{restaurant_id}/menu/{item_id:int}", response_model=schemas.MenuItemOut)
+async def get_menu_item(
+    restaurant_id: int, item_id: int, db: AsyncSession = Depends(get_async_read_db)
+):
+    async def load():
+        item = await _get_menu_item(db, restaurant_id, item_id)
+        if not item:
+            raise HTTPException(status_code=404, detail="Menu item not found")
+        return jsonable_encoder(schemas.MenuItemOut.model_validate(item))
+
+    return await restaurant_cache.aget_or_load(
+        restaurant_id, f"menu:{item_id}", load, **async_read_router.cache_options(db)
+    )
+
+
+@router.put("/{restaurant_id}/menu/{item_id:int}", response_model=schemas.MenuItemOut)
+async def update_menu_item(
+    restaurant_id: int,
+    item_id: int,
+    item: schemas.MenuItemCreate,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user),
+):
+    db_item = await db.scalar(
+        update(models.MenuItem)
+        .where(*_owned_menu_item(restaurant_id, item_id, user))
+        .values(**item.dict())
+        .returning(models.MenuItem)
+    )
+    if db_item is None:
+        _menu_write_refused(await db.scalar(_menu_item_exists(restaurant_id, item_id)))
+
+    await db.commit()
+    await restaurant_cache.ainvalidate(restaurant_id)
+    return db_item
+
+
+@router.delete("/{restaurant_id}/menu/{item_id:int}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_menu_item(
+    restaurant_id: int,
+    item_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user),
+):
+    deleted = await db.execute(
+        delete(models.MenuItem)
+        .where(*_owned_menu_item(restaurant_id, item_id, user))
+        .returning(models.MenuItem.id)
+    )
+    if deleted.first() is None:
+        _menu_write_refused(await db.scalar(_menu_item_exists(restaurant_id, item_id)))
+
+    await db.commit()
+    await restaurant_cache.ainvalidate(restaurant_id)
+    return None
+
+
+# ---------- Timings ----------
+@router.put("/{restaurant_id}/timings", response_model=List[schemas.RestaurantTimingOut])
+async def set_timings(
+    restaurant_id: int,
+    timings: List[schemas.RestaurantTimingCreate],
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user),
+):
+    restaurant = await _get_restaurant(db, restaurant_id)
+    _ensure_owner_or_403(restaurant, user)
+
+    await db.execute(
+        delete(models.RestaurantTiming).where(models.RestaurantTiming.restaurant_id == restaurant_id)
+    )
+    db_timings = [models.RestaurantTiming(restaurant_id=restaurant_id, **t.dict()) for t in timings]
+    await acommit_returning(db, *db_timings)
+    await restaurant_cache.ainvalidate(restaurant_id)
+    # The flushed rows are the response, so no re-select is needed
+    return db_timings
@@ -1,5 +1,8 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, computed_field, field_serializer
+from typing import Dict, List, Optional, Union
+
+import variants
+from blobstore import file_url
 
 
 class MenuItemBase(BaseModel):
@@ -18,6 +21,15 @@ class MenuItemOut(MenuItemBase):
     class Config:
         from_attributes = True
 
+    @field_serializer("image")
+    def image_url(self, image: Optional[str]) -> Optional[str]:
+        return file_url(image)
+
+    @computed_field
+    @property
+    def image_variants(self) -> Dict[str, str]:
+        return variants.variant_urls(self.image)
+
 
 class RestaurantBase(BaseModel):
     name: str
@@ -53,6 +65,41 @@ class RestaurantOut(RestaurantBase):
     class Config:
         from_attributes = True
 
+    @field_serializer("license_image", "restaurant_image")
+    def image_url(self, image: Optional[str]) -> Optional[str]:
+        return file_url(image)
+
+    @computed_field
+    @property
+    def restaurant_image_variants(self) -> Dict[str, str]:
+        return variants.variant_urls(self.restaurant_image)
+
+class BulkImportResult(BaseModel):
+    inserted: int
+
+
+# Slim projection for browse screens (``view=summary``)
+class RestaurantSummary(BaseModel):
+    id: int
+    name: str
+    address: Optional[str] = None
+    restaurant_image: Optional[str] = None
+    approved: Optional[str] = None
+    class Config:
+        from_attributes = True
+
+    @field_serializer("restaurant_image")
+    def image_url(self, image: Optional[str]) -> Optional[str]:
+        return file_url(image)
+
+    @computed_field
+    @property
+    def restaurant_image_variants(self) -> Dict[str, str]:
+        return variants.variant_urls(self.restaurant_image)
+
+# Listings return full restaurants, or summaries with ``view=summary``
+RestaurantListing = Union[List[RestaurantOut], List[RestaurantSummary]]
+
 # For admin approval
 class RestaurantApproval(BaseModel):
     approved: str  # 'approved' or 'rejected'
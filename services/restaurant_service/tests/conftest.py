@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    # The service reads its settings at import time and keeps uploads relative to cwd
+    workdir = tmp_path_factory.mktemp("restaurant_service")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DATABASE_URL", f"sqlite:///{workdir / 'restaurant.db'}")
+        mp.setenv("JWT_REVOCATION_FILE", str(workdir / "revoked_tokens.jsonl"))
+        mp.delenv("CACHE_URL", raising=False)
+        mp.delenv("ASYNC_DB", raising=False)
+        mp.delenv("DATABASE_REPLICA_URLS", raising=False)
+        mp.chdir(workdir)
+        mp.syspath_prepend(SERVICE_DIR)
+        import main
+        yield main.app
+
+
+@pytest.fixture(scope="session")
+def sessions(app):
+    """The session dependencies whose statements count against a request."""
+    import database
+
+    return database.get_db, database.get_read_db
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def restaurants(client):
+    """Ids of approved restaurants, each with menu items and timings."""
+    import database, models
+
+    db = database.SessionLocal()
+    try:
+        ids = []
+        for n in range(5):
+            restaurant = models.Restaurant(name=f"Restaurant {n}", address="x", owner_id=n + 1, approved="approved")
+            restaurant.menu_items = [models.MenuItem(name=f"Dish {n}.{i}", price=9.5) for i in range(3)]
+            restaurant.timings = [
+                models.RestaurantTiming(day_of_week=day, open_time="09:00", close_time="22:00")
+                for day in ("Monday", "Tuesday")
+            ]
+            db.add(restaurant)
+            db.flush()
+            ids.append(restaurant.id)
+        db.commit()
+        return ids
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def owned_item(restaurants):
+    """``(restaurant_id, item_id, owner headers)`` for a menu item of restaurants[1]."""
+    import database, models
+    from common.auth_utils import create_access_token
+
+    db = database.SessionLocal()
+    try:
+        restaurant = db.get(models.Restaurant, restaurants[1])
+        item_id = db.query(models.MenuItem.id).filter(models.MenuItem.restaurant_id == restaurant.id).first().id
+        token = create_access_token({"user_id": restaurant.owner_id, "role": "restaurantadmin"})
+        return restaurant.id, item_id, {"Authorization": f"Bearer {token}"}
+    finally:
+        db.close()
@@ -0,0 +1,49 @@
+import pytest
+
+
+# One page query plus one selectinload each for menu_items and timings
+@pytest.mark.query_budget(max_queries=3, max_repeats=1)
+def test_restaurant_list(client, sessions, restaurants, query_budget):
+    with query_budget(client.app, *sessions) as requests:
+        response = client.get("/restaurant/", params={"limit": 20})
+    assert response.status_code == 200
+    assert {r["id"] for r in response.json()} >= set(restaurants)
+    assert all(r["menu_items"] and r["timings"] for r in response.json())
+    assert len(requests) == 1
+
+
+@pytest.mark.query_budget(max_queries=1)
+def test_restaurant_list_summary(client, sessions, restaurants, query_budget):
+    with query_budget(client.app, *sessions):
+        response = client.get("/restaurant/", params={"view": "summary"})
+    assert response.status_code == 200
+
+
+# Same shape as the list, for one restaurant on a cache miss
+@pytest.mark.query_budget(max_queries=3, max_repeats=1)
+def test_restaurant_detail(client, sessions, restaurants, query_budget):
+    with query_budget(client.app, *sessions):
+        response = client.get(f"/restaurant/{restaurants[0]}")
+    assert response.status_code == 200
+    assert len(response.json()["menu_items"]) == 3
+
+
+# One UPDATE ... RETURNING with the ownership check in its WHERE
+@pytest.mark.query_budget(max_queries=1)
+def test_update_menu_item(client, sessions, owned_item, query_budget):
+    restaurant_id, item_id, headers = owned_item
+    with query_budget(client.app, *sessions):
+        response = client.put(
+            f"/restaurant/{restaurant_id}/menu/{item_id}", json={"name": "Renamed", "price": 11.0}, headers=headers
+        )
+    assert response.status_code == 200
+    assert response.json()["name"] == "Renamed"
+
+
+@pytest.mark.query_budget(max_queries=1)
+def test_delete_menu_item(client, sessions, owned_item, query_budget):
+    restaurant_id, item_id, headers = owned_item
+    with query_budget(client.app, *sessions):
+        response = client.delete(f"/restaurant/{restaurant_id}/menu/{item_id}", headers=headers)
+    assert response.status_code == 204
+    assert client.get(f"/restaurant/{restaurant_id}/menu/{item_id}").status_code == 404
@@ -0,0 +1,167 @@
+import hashlib
+import os
+import tempfile
+from typing import NamedTuple
+
+from fastapi import HTTPException, Request, UploadFile, status
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+import blobstore
+from blobstore import UPLOAD_DIR
+from common.timing import TimedRoute
+
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+CHUNK_SIZE = 64 * 1024
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# Whole multipart body: one upload plus room for the other form fields
+MAX_REQUEST_BYTES = int(os.getenv("MAX_UPLOAD_REQUEST_BYTES", str(MAX_UPLOAD_BYTES + 1024 * 1024)))
+
+
+class StoredUpload(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+
+
+def _too_large(max_bytes: int):
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Upload exceeds {max_bytes} bytes",
+    )
+
+
+class BlobSpool:
+    """Temp file in UPLOAD_DIR that file parts are parsed straight into.
+
+    Stands in for Starlette's spooled temp file: the body is hashed as it
+    arrives and ``store`` moves the finished file into the blob store, so an
+    upload is written to disk once. Anything not stored is deleted on close.
+    """
+
+    def __init__(self, max_bytes: int = MAX_UPLOAD_BYTES):
+        fd, self.path = tempfile.mkstemp(dir=UPLOAD_DIR, prefix=".upload-")
+        self.file = os.fdopen(fd, "w+b")
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.digest = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self.close()
+            raise _too_large(self.max_bytes)
+        self.digest.update(data)
+        return self.file.write(data)
+
+    def read(self, size: int = -1) -> bytes:
+        return self.file.read(size)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self.file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.file.tell()
+
+    def store(self, filename: str = None) -> StoredUpload:
+        self.file.close()
+        path = blobstore.put(self.path, self.digest.hexdigest(), filename)
+        self.path = None
+        return StoredUpload(path=path, size=self.size, sha256=self.digest.hexdigest())
+
+    def close(self):
+        self.file.close()
+        if self.path is not None and os.path.exists(self.path):
+            os.unlink(self.path)
+        self.path = None
+
+
+class _BlobMultiPartParser(MultiPartParser):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.spools = []
+
+    def on_headers_finished(self):
+        super().on_headers_finished()
+        upload = self._current_part.file
+        if upload is not None:
+            # Swap the spooled file for one that already lives next to the blobs
+            upload.file.close()
+            upload.file = BlobSpool()
+            self.spools.append(upload.file)
+
+    async def parse(self):
+        try:
+            return await super().parse()
+        except BaseException:
+            for spool in self.spools:
+                spool.close()
+            raise
+
+
+class UploadRequest(Request):
+    async def _get_form(self, *, max_files=1000, max_fields=1000, max_part_size=1024 * 1024):
+        if self._form is None and self.headers.get("content-type", "").startswith("multipart/form-data"):
+            # Refuse before reading the body when the client declares its size
+            length = self.headers.get("content-length")
+            if length is not None and length.isdigit() and int(length) > MAX_REQUEST_BYTES:
+                raise _too_large(MAX_REQUEST_BYTES)
+            parser = _BlobMultiPartParser(
+                self.headers, self.stream(),
+                max_files=max_files, max_fields=max_fields, max_part_size=max_part_size,
+            )
+            try:
+                self._form = await parser.parse()
+            except MultiPartException as exc:
+                raise HTTPException(status_code=400, detail=exc.message)
+        return await super()._get_form(max_files=max_files, max_fields=max_fields, max_part_size=max_part_size)
+
+
+class UploadRoute(TimedRoute):
+    """Route whose multipart file parts are streamed into BlobSpools."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def upload_handler(request):
+            return await handler(UploadRequest(request.scope, request.receive))
+
+        return upload_handler
+
+
+def save_upload(upload: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> StoredUpload:
+    """Store ``upload`` in the content-addressed blob store.
+
+    Under ``UploadRoute`` the body was already streamed into a temp file in
+    UPLOAD_DIR, hashed on the fly and size-checked while parsing, so this
+    only moves it into place. Otherwise the body is copied in fixed-size
+    chunks. Either way readers never see a partial file, a rejected upload
+    leaves nothing behind and a file whose content is already stored is
+    deduplicated onto the existing blob. Call it from sync handlers: FastAPI
+    runs those in its threadpool, so the blocking file I/O never touches
+    the event loop.
+    """
+    if isinstance(upload.file, BlobSpool):
+        return upload.file.store(upload.filename)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            upload.file.seek(0)
+            while True:
+                chunk = upload.file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _too_large(max_bytes)
+                digest.update(chunk)
+                out.write(chunk)
+        path = blobstore.put(tmp_path, digest.hexdigest(), upload.filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return StoredUpload(path=path, size=size, sha256=digest.hexdigest())
@@ -0,0 +1,129 @@
+"""Fixed-width WebP/JPEG variants of uploaded images.
+
+Variants sit next to their blob as ``<sha256>_w<width>.<ext>`` so their URLs
+can be derived from the stored image path alone, without extra columns.
+They are rendered in a process pool after the upload is committed, and a
+response lists only the variants already on disk; until then clients use
+the original.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import blobstore
+from common.cache import TTLCache
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it no variants are produced
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = tuple(
+    int(w) for w in os.getenv("IMAGE_VARIANT_WIDTHS", "160,480,960").split(",")
+)
+VARIANT_FORMATS = {"webp": "WEBP", "jpg": "JPEG"}
+VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", "2"))
+
+_executor = None
+# Uploads are handled in the threadpool; without it two could each start a pool
+_executor_lock = threading.Lock()
+# Variants are never rewritten, so a hit saves the stat on later responses
+_rendered = TTLCache(maxsize=65536, ttl=3600)
+
+
+def variant_path(path: str, width: int, ext: str) -> str:
+    root = os.path.splitext(path)[0]
+    return f"{root}_w{width}.{ext}"
+
+
+def _is_rendered(path: str) -> bool:
+    if _rendered.get(path):
+        return True
+    if os.path.exists(path):
+        _rendered.set(path, True)
+        return True
+    return False
+
+
+def variant_urls(path: str) -> dict:
+    """URLs of the variants of ``path`` (a stored path or its public URL) that exist."""
+    if Image is None or not path:
+        return {}
+    path = blobstore.local_path(path)
+    if not blobstore.is_blob(path):
+        return {}
+    urls = {}
+    for width in VARIANT_WIDTHS:
+        for ext in VARIANT_FORMATS:
+            out_path = variant_path(path, width, ext)
+            if _is_rendered(out_path):
+                urls[f"w{width}_{ext}"] = blobstore.public_url(out_path)
+    return urls
+
+
+def generate_variants(path: str) -> int:
+    """Render every missing variant of ``path``; runs inside a worker process."""
+    written = 0
+    with Image.open(path) as original:
+        original.load()
+        for width in VARIANT_WIDTHS:
+            # Never upscale: narrow originals are re-encoded at their own size
+            target = min(width, original.width)
+            height = max(1, round(original.height * target / original.width))
+            resized = original.resize((target, height), Image.LANCZOS)
+            for ext, fmt in VARIANT_FORMATS.items():
+                out_path = variant_path(path, width, ext)
+                if os.path.exists(out_path):
+                    continue
+                image = resized.convert("RGB") if fmt == "JPEG" else resized
+                tmp_path = out_path + ".tmp"
+                image.save(tmp_path, fmt, quality=80)
+                os.replace(tmp_path, out_path)
+                written += 1
+    return written
+
+
+def _log_failure(future):
+    # Jobs still queued at shutdown are cancelled, not failed
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("image variant generation failed", exc_info=future.exception())
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking a process that runs threadpool workers is not safe
+            _executor = ProcessPoolExecutor(
+                max_workers=VARIANT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def schedule(path: str, on_rendered=None):
+    """Queue variant generation for a stored blob without blocking the request.
+
+    ``on_rendered()`` runs in a pool thread once the variants exist, e.g. to
+    drop cached responses that were built before they did.
+    """
+    if Image is None or not path or not blobstore.is_blob(path):
+        return
+    future = _get_executor().submit(generate_variants, path)
+    future.add_done_callback(_log_failure)
+    if on_rendered is not None:
+        future.add_done_callback(
+            lambda f: on_rendered() if not f.cancelled() and f.exception() is None else None
+        )
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None